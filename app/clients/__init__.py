@@ -1,11 +1,13 @@
 """Clients package - External API clients."""
 
-from app.clients.github_client import GitHubClient, github_client
-from app.clients.llm_client import LLMClient, llm_client
+from app.clients.github_client import GitHubClient, get_github_client, init_github_client
+from app.clients.llm_client import LLMClient, get_llm_client, init_llm_client
 
 __all__ = [
     "GitHubClient", 
-    "github_client",
+    "get_github_client",
+    "init_github_client",
     "LLMClient",
-    "llm_client"
+    "get_llm_client",
+    "init_llm_client"
 ]
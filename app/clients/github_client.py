@@ -1,11 +1,14 @@
 """GitHub API client for fetching issues."""
 
+import time
 import httpx
-from typing import List
-from dataclasses import dataclass
+from typing import List, Optional
+from dataclasses import dataclass, field
 
 from app.config import settings
 from app.exceptions import GitHubClientError
+from app.metrics import GITHUB_PAGE_LATENCY, GITHUB_PAGES_PER_SCAN
+from app import timing
 
 
 @dataclass
@@ -16,6 +19,32 @@ class Issue:
     body: str
     html_url: str
     created_at: str
+    updated_at: str = ""
+    state: str = "open"
+    labels: List[str] = field(default_factory=list)
+    assignees: List[str] = field(default_factory=list)
+    milestone: Optional[str] = None
+    comments: int = 0
+    reactions: int = 0
+
+
+def parse_issue(item: dict) -> Issue:
+    """Normalize a GitHub API issue payload (REST listing or webhook) to an Issue."""
+    return Issue(
+        id=item["id"],
+        title=item["title"],
+        body=item.get("body") or "",
+        html_url=item["html_url"],
+        created_at=item["created_at"],
+        updated_at=item.get("updated_at") or item["created_at"],
+        state=item.get("state") or "open",
+        # Labels are objects in API payloads, but may be plain names elsewhere
+        labels=[label["name"] if isinstance(label, dict) else label for label in item.get("labels") or []],
+        assignees=[user["login"] for user in item.get("assignees") or []],
+        milestone=(item.get("milestone") or {}).get("title"),
+        comments=item.get("comments") or 0,
+        reactions=(item.get("reactions") or {}).get("total_count", 0)
+    )
 
 
 class GitHubClient:
@@ -23,7 +52,9 @@ class GitHubClient:
     
     BASE_URL = "https://api.github.com"
     
-    def __init__(self):
+    def __init__(self, transport: Optional[httpx.AsyncBaseTransport] = None):
+        # A custom transport (e.g. httpx.MockTransport) replaces the network
+        self.transport = transport
         self.headers = {
             "Accept": "application/vnd.github.v3+json",
             "User-Agent": "GitHub-Issue-Analyzer"
@@ -40,7 +71,9 @@ class GitHubClient:
         page = 1
         per_page = 100  # Maximum allowed by GitHub
         
-        async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as client:
+        async with httpx.AsyncClient(
+            timeout=30.0, follow_redirects=True, transport=self.transport
+        ) as client:
             while True:
                 url = f"{self.BASE_URL}/repos/{owner}/{repo}/issues"
                 params = {
@@ -49,12 +82,17 @@ class GitHubClient:
                     "per_page": per_page
                 }
                 
+                start = time.perf_counter()
                 try:
                     response = await client.get(url, headers=self.headers, params=params)
                 except httpx.TimeoutException:
                     raise GitHubClientError("GitHub API request timed out", 504)
                 except httpx.RequestError as e:
                     raise GitHubClientError(f"Network error: {str(e)}", 502)
+                finally:
+                    elapsed = time.perf_counter() - start
+                    GITHUB_PAGE_LATENCY.observe(elapsed)
+                    timing.record("github.page", elapsed)
                 
                 # Handle rate limiting
                 if response.status_code == 403:
@@ -96,14 +134,7 @@ class GitHubClient:
                     if "pull_request" in item:
                         continue
                     
-                    issue = Issue(
-                        id=item["id"],
-                        title=item["title"],
-                        body=item.get("body") or "",
-                        html_url=item["html_url"],
-                        created_at=item["created_at"]
-                    )
-                    issues.append(issue)
+                    issues.append(parse_issue(item))
                 
                 # If we got fewer items than per_page, we've reached the end
                 if len(data) < per_page:
@@ -111,8 +142,21 @@ class GitHubClient:
                 
                 page += 1
         
+        GITHUB_PAGES_PER_SCAN.observe(page)
         return issues
 
 
-# Singleton instance
-github_client = GitHubClient()
+# Singleton instance, built by init_github_client() in the app lifespan
+_github_client: Optional[GitHubClient] = None
+
+
+def init_github_client() -> GitHubClient:
+    """Build the shared GitHub client."""
+    global _github_client
+    _github_client = GitHubClient()
+    return _github_client
+
+
+def get_github_client() -> GitHubClient:
+    """Return the shared GitHub client, building it if the lifespan hook has not run (e.g. scripts)."""
+    return _github_client or init_github_client()
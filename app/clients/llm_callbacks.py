@@ -0,0 +1,31 @@
+"""LangChain callbacks for LLM observability (imported lazily with the LLM stack)."""
+
+from typing import Any
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+from app.metrics import LLM_TOKENS
+
+
+class TokenUsageCallback(BaseCallbackHandler):
+    """
+    Records token usage reported by the chat model into Prometheus counters.
+    Also keeps the totals it saw, so a per-call instance reports that call's usage.
+    """
+    
+    def __init__(self):
+        self.input_tokens = 0
+        self.output_tokens = 0
+    
+    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if usage:
+                    input_tokens = usage.get("input_tokens", 0)
+                    output_tokens = usage.get("output_tokens", 0)
+                    LLM_TOKENS.labels("in").inc(input_tokens)
+                    LLM_TOKENS.labels("out").inc(output_tokens)
+                    self.input_tokens += input_tokens
+                    self.output_tokens += output_tokens
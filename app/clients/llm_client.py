@@ -1,30 +1,69 @@
 """LLM client for analyzing GitHub issues using LangChain."""
 
-from typing import List
-from langchain_openai import ChatOpenAI
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import StrOutputParser
-from langchain_core.documents import Document
+import asyncio
+import hashlib
+import time
+from typing import TYPE_CHECKING, Awaitable, Callable, Dict, List, Optional, Tuple
 
+from app.clients.llm_planner import DIRECT_LIMIT, AnalysisPlan, plan_analysis, reduce_cost
+from app.clients.llm_stats import LLMCallStats, llm_call_stats
 from app.config import settings
-from app.exceptions import LLMError
+from app.exceptions import AnalysisBudgetExceededError, LLMError
+from app.metrics import LLM_CALL_LATENCY, LLM_REQUESTS_IN_FLIGHT
+from app.repositories.coordination_repository import CoordinationRepository, RunCheckpoints, coordination_repository
+from app import timing
+
+# Reduce focus for prompt-independent facts shared by a batch of prompts
+FACTS_FOCUS = "themes, bug categories, severity signals and affected components"
+
+if TYPE_CHECKING:
+    # LangChain takes seconds to import, so it is only loaded when analysis runs
+    from langchain_core.documents import Document
+    from langchain_core.language_models import BaseChatModel
+    from langchain_core.runnables import Runnable
 
 
 class LLMClient:
     """Client for LLM-based issue analysis using LangChain."""
     
-    def __init__(self):
-        self.llm = None
-        if settings.OPENAI_API_KEY:
-            self.llm = ChatOpenAI(
+    def __init__(
+        self,
+        llm: Optional["BaseChatModel"] = None,
+        summary_store: Optional[CoordinationRepository] = None,
+        stats: Optional[LLMCallStats] = None
+    ):
+        # An explicit chat model (e.g. a fake for benchmarks) takes precedence
+        self._llm = llm
+        # Shared store for map-phase summaries, reused across workers and requests
+        self.summary_store = summary_store
+        # Measured call latency and token usage, used to plan budgeted analyses
+        self.stats = stats or llm_call_stats
+    
+    @property
+    def llm(self) -> Optional["BaseChatModel"]:
+        """Chat model, built on first use so LangChain is only imported when analysis runs."""
+        if self._llm is None and settings.OPENAI_API_KEY:
+            from langchain_openai import ChatOpenAI
+            
+            self._llm = ChatOpenAI(
                 api_key=settings.OPENAI_API_KEY,
                 model=settings.LLM_MODEL,
                 temperature=0.7,
                 max_tokens=2000
             )
+        return self._llm
+    
+    def _build_chain(self, messages: List[Tuple[str, str]]) -> "Runnable":
+        """Build a prompt | llm | parser chain from (role, template) messages."""
+        from langchain_core.prompts import ChatPromptTemplate
+        from langchain_core.output_parsers import StrOutputParser
+        
+        return ChatPromptTemplate.from_messages(messages) | self.llm | StrOutputParser()
     
-    def _format_issues_as_documents(self, issues: List[dict]) -> List[Document]:
+    def _format_issues_as_documents(self, issues: List[dict]) -> List["Document"]:
         """Convert issues to LangChain Document objects."""
+        from langchain_core.documents import Document
+        
         documents = []
         for issue in issues:
             body = issue.get("body", "") or "No description provided"
@@ -47,14 +86,184 @@ Description: {body}"""
             documents.append(doc)
         return documents
     
-    def _chunk_documents(self, documents: List[Document], chunk_size: int = 25) -> List[List[Document]]:
+    async def _invoke(self, chain: "Runnable", inputs: Dict[str, str], phase: str) -> str:
+        """Run one chain call, recording latency, tokens and in-flight count for its phase."""
+        from app.clients.llm_callbacks import TokenUsageCallback
+        
+        usage = TokenUsageCallback()
+        start = time.perf_counter()
+        LLM_REQUESTS_IN_FLIGHT.inc()
+        input_chars = sum(len(value) for value in inputs.values())
+        try:
+            result = await chain.ainvoke(inputs, config={"callbacks": [usage]})
+        except asyncio.CancelledError:
+            # Cancelled at a deadline: the call would have taken at least this long
+            self.stats.observe_cancelled(phase, time.perf_counter() - start, input_chars)
+            raise
+        finally:
+            LLM_REQUESTS_IN_FLIGHT.dec()
+            elapsed = time.perf_counter() - start
+            LLM_CALL_LATENCY.labels(phase).observe(elapsed)
+            timing.record(f"llm.{phase}", elapsed)
+        
+        self.stats.observe(phase, elapsed, input_chars, usage.input_tokens, usage.output_tokens)
+        return result
+    
+    async def _checkpointed(
+        self,
+        checkpoints: Optional[RunCheckpoints],
+        stage: str,
+        idx: int,
+        call: Callable[[], Awaitable[str]]
+    ) -> str:
+        """Return a step's checkpointed output, or run the step and checkpoint its output."""
+        if checkpoints is not None:
+            saved = checkpoints.get(stage, idx)
+            if saved is not None:
+                return saved
+        output = await call()
+        if checkpoints is not None:
+            await asyncio.to_thread(checkpoints.put, stage, idx, output)
+        return output
+    
+    def _chunk_documents(self, documents: List["Document"], chunk_size: int = 25) -> List[List["Document"]]:
         """Split documents into smaller chunks."""
         return [documents[i:i + chunk_size] for i in range(0, len(documents), chunk_size)]
     
-    async def analyze(self, prompt: str, issues: List[dict]) -> str:
+    async def analyze(
+        self,
+        prompt: str,
+        issues: List[dict],
+        checkpoints: Optional[RunCheckpoints] = None
+    ) -> str:
         """
         Analyze issues using LangChain with map-reduce pattern.
         Handles large issue sets by chunking and summarizing.
+        With `checkpoints`, every completed map/reduce output is persisted and
+        steps that already completed in an earlier attempt are skipped.
+        """
+        if not self.llm:
+            raise LLMError("OpenAI API key not configured")
+        
+        if not issues:
+            raise LLMError("No issues to analyze")
+        
+        # Formatting thousands of issues is CPU work; keep it off the event loop
+        with timing.span("llm.format"):
+            documents = await asyncio.to_thread(self._format_issues_as_documents, issues)
+        
+        if len(documents) <= 20:
+            return await self._direct_analysis(prompt, documents, checkpoints)
+        
+        return await self._map_reduce_analysis(prompt, documents, checkpoints)
+    
+    def plan(
+        self,
+        issues: List[dict],
+        latency_budget: Optional[float] = None,
+        token_budget: Optional[int] = None
+    ) -> AnalysisPlan:
+        """Plan an analysis of `issues` (most recent first) within the given budgets."""
+        return plan_analysis(issues, latency_budget, token_budget, self.stats, settings.LLM_MAX_CONCURRENCY)
+    
+    async def analyze_within(
+        self,
+        prompt: str,
+        issues: List[dict],
+        plan: AnalysisPlan,
+        deadline: Optional[float] = None
+    ) -> Tuple[str, bool, int]:
+        """
+        Run an analysis shaped by `plan`, finishing by `deadline` (a time.monotonic() value).
+        
+        When the deadline nears, unfinished map and reduce calls are dropped so the
+        completed summaries can still be synthesized in time. Returns the analysis,
+        whether it is partial and how many issues the completed summaries cover.
+        """
+        if not self.llm:
+            raise LLMError("OpenAI API key not configured")
+        
+        if not issues:
+            raise LLMError("No issues to analyze")
+        
+        with timing.span("llm.format"):
+            documents = await asyncio.to_thread(self._format_issues_as_documents, issues[:plan.issue_count])
+        
+        if plan.direct:
+            try:
+                return await asyncio.wait_for(
+                    self._direct_analysis(prompt, documents), self._remaining(deadline)
+                ), False, len(documents)
+            except asyncio.TimeoutError:
+                raise AnalysisBudgetExceededError("Latency budget exhausted before the analysis finished")
+        
+        chunks = self._chunk_documents(documents, chunk_size=plan.chunk_size)
+        
+        # Stop mapping early enough to reduce and synthesize what has completed
+        map_deadline = None
+        if deadline is not None:
+            reduce_seconds, _ = reduce_cost(
+                len(chunks), plan.fan_in, plan.concurrency, self.stats, self.stats.output_tokens("map")
+            )
+            map_deadline = deadline - reduce_seconds
+        completed = await self._map_chunks(
+            self._map_chain(), chunks, "map", {"user_prompt": prompt},
+            concurrency=plan.concurrency, deadline=map_deadline
+        )
+        if not completed:
+            # Slower than planned: a direct call over the most recent issues may still fit
+            try:
+                analysis = await asyncio.wait_for(
+                    self._direct_analysis(prompt, documents[:DIRECT_LIMIT]), self._remaining(deadline)
+                )
+            except asyncio.TimeoutError:
+                raise AnalysisBudgetExceededError("Latency budget exhausted before any issues were summarized")
+            return analysis, True, len(documents[:DIRECT_LIMIT])
+        partial = len(completed) < len(chunks)
+        summaries = [f"Batch {i+1} Summary:\n{summary}" for i, summary in enumerate(completed.values())]
+        # Issues covered by each summary
+        covered = [len(chunks[i]) for i in completed]
+        
+        # Reduce levels must leave time for the final call
+        reduce_deadline = deadline - self.stats.latency("final") if deadline is not None else None
+        while len(summaries) > plan.fan_in:
+            reduced = await self._reduce_summaries(
+                summaries, prompt, fan_in=plan.fan_in, concurrency=plan.concurrency, deadline=reduce_deadline
+            )
+            if reduced:
+                batches = [covered[i:i + plan.fan_in] for i in range(0, len(covered), plan.fan_in)]
+                partial = partial or len(reduced) < len(batches)
+                summaries = list(reduced.values())
+                covered = [sum(batches[i]) for i in reduced]
+            else:
+                # No time for another level: synthesize the summaries of the most recent issues
+                summaries = summaries[:plan.fan_in]
+                covered = covered[:plan.fan_in]
+                partial = True
+        
+        try:
+            analysis = await asyncio.wait_for(self._final_reduce(summaries, prompt), self._remaining(deadline))
+            return analysis, partial, sum(covered)
+        except asyncio.TimeoutError:
+            # The summaries are the best synthesis that fits in the budget
+            return "\n\n".join(summaries), True, sum(covered)
+    
+    @staticmethod
+    def _remaining(deadline: Optional[float]) -> Optional[float]:
+        """Seconds left until a deadline (None without one)."""
+        if deadline is None:
+            return None
+        return max(deadline - time.monotonic(), 0)
+    
+    async def analyze_batch(self, prompts: List[str], issues: List[dict]) -> List[str]:
+        """
+        Answer several prompts about the same issues, sharing one map pass.
+        
+        Large issue sets are mapped once into prompt-independent facts (themes, bug
+        categories, severity signals, affected components), reduced once, and then
+        each prompt only costs its final call: about chunks + N calls instead of
+        N x chunks. At most LLM_MAX_CONCURRENCY per-prompt calls run at once.
+        Results are returned in the order of `prompts`.
         """
         if not self.llm:
             raise LLMError("OpenAI API key not configured")
@@ -62,18 +271,53 @@ Description: {body}"""
         if not issues:
             raise LLMError("No issues to analyze")
         
-        documents = self._format_issues_as_documents(issues)
+        with timing.span("llm.format"):
+            documents = await asyncio.to_thread(self._format_issues_as_documents, issues)
         
+        # Small sets fit in one call per prompt; there is no map pass to share
         if len(documents) <= 20:
-            return await self._direct_analysis(prompt, documents)
+            return await self._per_prompt([lambda p=p: self._direct_analysis(p, documents) for p in prompts])
+        
+        facts = await self._extract_facts(documents)
+        while len(facts) > 5:
+            facts = list((await self._reduce_summaries(facts, FACTS_FOCUS)).values())
+        
+        return await self._per_prompt([lambda p=p: self._final_reduce(facts, p) for p in prompts])
+    
+    async def _per_prompt(self, calls: List[Callable[[], Awaitable[str]]]) -> List[str]:
+        """
+        Run one call per prompt, at most LLM_MAX_CONCURRENCY at once like map and reduce calls.
+        If one fails, the others are cancelled rather than left running for a failed request.
+        """
+        semaphore = asyncio.Semaphore(settings.LLM_MAX_CONCURRENCY)
+        
+        async def bounded(call: Callable[[], Awaitable[str]]) -> str:
+            async with semaphore:
+                return await call()
+        
+        tasks = [asyncio.ensure_future(bounded(call)) for call in calls]
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+            for task in done:
+                if task.exception() is not None:
+                    raise task.exception()
+        finally:
+            # After a failure or when cancelled
+            for task in tasks:
+                task.cancel()
         
-        return await self._map_reduce_analysis(prompt, documents)
+        return [task.result() for task in tasks]
     
-    async def _direct_analysis(self, prompt: str, documents: List[Document]) -> str:
+    async def _direct_analysis(
+        self,
+        prompt: str,
+        documents: List["Document"],
+        checkpoints: Optional[RunCheckpoints] = None
+    ) -> str:
         """Analyze a small set of issues directly."""
         context = "\n\n---\n\n".join([doc.page_content for doc in documents])
         
-        analysis_prompt = ChatPromptTemplate.from_messages([
+        chain = self._build_chain([
             ("system", """You are an experienced open-source maintainer and software engineer.
 You are analyzing GitHub issues for a repository. Provide clear, actionable insights based on the issues provided.
 Be specific about patterns, priorities, and recommendations."""),
@@ -86,22 +330,37 @@ Here are the GitHub issues to analyze:
 Please provide a comprehensive analysis addressing the user's request.""")
         ])
         
-        chain = analysis_prompt | self.llm | StrOutputParser()
-        
         try:
-            result = await chain.ainvoke({
+            result = await self._checkpointed(checkpoints, "direct", 0, lambda: self._invoke(chain, {
                 "user_prompt": prompt,
                 "context": context
-            })
+            }, phase="direct"))
             return result
         except Exception as e:
             raise LLMError(f"LLM analysis failed: {str(e)}")
     
-    async def _map_reduce_analysis(self, prompt: str, documents: List[Document]) -> str:
+    async def _map_reduce_analysis(
+        self,
+        prompt: str,
+        documents: List["Document"],
+        checkpoints: Optional[RunCheckpoints] = None
+    ) -> str:
         """Analyze large issue sets using map-reduce pattern."""
         chunks = self._chunk_documents(documents, chunk_size=25)
         
-        map_prompt = ChatPromptTemplate.from_messages([
+        summaries = await self._map_chunks(self._map_chain(), chunks, "map", {"user_prompt": prompt}, checkpoints)
+        chunk_summaries = [f"Batch {i+1} Summary:\n{summary}" for i, summary in enumerate(summaries.values())]
+        
+        level = 0
+        while len(chunk_summaries) > 5:
+            level += 1
+            chunk_summaries = list((await self._reduce_summaries(chunk_summaries, prompt, checkpoints, level)).values())
+        
+        return await self._final_reduce(chunk_summaries, prompt, checkpoints)
+    
+    def _map_chain(self) -> "Runnable":
+        """Chain summarizing one chunk of issues with the user's prompt as focus."""
+        return self._build_chain([
             ("system", """You are analyzing a batch of GitHub issues.
 Summarize the key themes, common problems, and notable patterns in these issues.
 Be concise but comprehensive. Focus on actionable insights."""),
@@ -113,29 +372,107 @@ User's focus: {user_prompt}
 
 Provide a concise summary (max 300 words) of the main themes and insights.""")
         ])
+    
+    async def _extract_facts(self, documents: List["Document"]) -> List[str]:
+        """Map pass that extracts prompt-independent facts per chunk, for reuse by any prompt."""
+        chunks = self._chunk_documents(documents, chunk_size=25)
+        
+        facts_chain = self._build_chain([
+            ("system", """You are extracting facts from a batch of GitHub issues.
+The facts will be used to answer many different questions later, so do not focus on any single question.
+Be concise and factual; reference issue titles or URLs for notable items."""),
+            ("user", """Extract structured facts from these GitHub issues:
+
+{context}
+
+Report as short bullet lists (max 300 words in total):
+- Themes: recurring topics and feature areas
+- Bug categories: kinds of defects (crashes, regressions, performance, documentation, ...)
+- Severity signals: data loss, security, crashes, blockers, many affected users
+- Affected components: modules, APIs, platforms or integrations mentioned""")
+        ])
         
-        map_chain = map_prompt | self.llm | StrOutputParser()
+        facts = await self._map_chunks(facts_chain, chunks, "facts", {})
+        return [f"Batch {i+1} Facts:\n{summary}" for i, summary in enumerate(facts.values())]
+    
+    async def _map_chunks(
+        self,
+        chain: "Runnable",
+        chunks: List[List["Document"]],
+        kind: str,
+        inputs: Dict[str, str],
+        checkpoints: Optional[RunCheckpoints] = None,
+        concurrency: int = 1,
+        deadline: Optional[float] = None
+    ) -> Dict[int, str]:
+        """
+        Run a map chain over every chunk, reusing shared summaries of unchanged chunks.
+        Outputs are checkpointed under the stage `kind` and the chunk index.
+        Up to `concurrency` calls run at once, in chunk order. Calls still unfinished at
+        `deadline` are cancelled; the completed summaries are returned by chunk index, in order.
+        """
+        contexts = ["\n\n---\n\n".join([doc.page_content for doc in chunk]) for chunk in chunks]
+        keys = [self._map_key(kind, inputs.get("user_prompt", ""), context) for context in contexts]
+        cached = {}
+        if self.summary_store:
+            cached = await asyncio.to_thread(self.summary_store.get_map_summaries, keys)
         
-        chunk_summaries = []
-        try:
-            for i, chunk in enumerate(chunks):
-                context = "\n\n---\n\n".join([doc.page_content for doc in chunk])
-                summary = await map_chain.ainvoke({
-                    "context": context,
-                    "user_prompt": prompt
-                })
-                chunk_summaries.append(f"Batch {i+1} Summary:\n{summary}")
-        except Exception as e:
-            raise LLMError(f"LLM chunk analysis failed: {str(e)}")
+        semaphore = asyncio.Semaphore(concurrency)
         
-        while len(chunk_summaries) > 5:
-            chunk_summaries = await self._reduce_summaries(chunk_summaries, prompt)
+        async def map_chunk(i: int, context: str, key: str) -> str:
+            async with semaphore:
+                summary = await self._checkpointed(
+                    checkpoints, kind, i,
+                    lambda: self._invoke(chain, {"context": context, **inputs}, phase="map")
+                )
+            if self.summary_store:
+                await asyncio.to_thread(self.summary_store.put_map_summary, key, summary)
+            return summary
         
-        return await self._final_reduce(chunk_summaries, prompt)
+        summaries = {i: cached[key] for i, key in enumerate(keys) if key in cached}
+        tasks = {
+            asyncio.ensure_future(map_chunk(i, context, key)): i
+            for i, (context, key) in enumerate(zip(contexts, keys)) if key not in cached
+        }
+        try:
+            if tasks:
+                done, _ = await asyncio.wait(
+                    tasks, timeout=self._remaining(deadline), return_when=asyncio.FIRST_EXCEPTION
+                )
+                for task in done:
+                    if task.exception() is not None:
+                        raise LLMError(f"LLM chunk analysis failed: {str(task.exception())}")
+                    summaries[tasks[task]] = task.result()
+        finally:
+            # Past the deadline, after a failure or when cancelled
+            for task in tasks:
+                task.cancel()
+        
+        return {i: summaries[i] for i in sorted(summaries)}
+    
+    @staticmethod
+    def _map_key(kind: str, prompt: str, context: str) -> str:
+        """Content key of a map-phase summary: same kind, model, prompt and chunk give the same summary."""
+        raw = "\0".join([kind, settings.LLM_MODEL, prompt, context])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
     
-    async def _reduce_summaries(self, summaries: List[str], prompt: str) -> List[str]:
-        """Reduce multiple summaries into fewer summaries."""
-        reduce_prompt = ChatPromptTemplate.from_messages([
+    async def _reduce_summaries(
+        self,
+        summaries: List[str],
+        prompt: str,
+        checkpoints: Optional[RunCheckpoints] = None,
+        level: int = 1,
+        fan_in: int = 5,
+        concurrency: int = 1,
+        deadline: Optional[float] = None
+    ) -> Dict[int, str]:
+        """
+        Reduce multiple summaries into fewer summaries, `fan_in` at a time
+        (checkpointed as stage `reduce<level>`).
+        Batches still unfinished at `deadline` are cancelled; the completed reductions
+        are returned by batch index, in order.
+        """
+        reduce_chain = self._build_chain([
             ("system", """You are synthesizing multiple analysis summaries.
 Combine the key insights, identify common patterns, and highlight priorities.
 Be concise and focus on the most important findings."""),
@@ -148,27 +485,45 @@ Focus on: {user_prompt}
 Provide a concise synthesis (max 400 words).""")
         ])
         
-        reduce_chain = reduce_prompt | self.llm | StrOutputParser()
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def reduce_batch(idx: int, batch: List[str]) -> str:
+            summaries_text = "\n\n---\n\n".join(batch)
+            async with semaphore:
+                return await self._checkpointed(
+                    checkpoints, f"reduce{level}", idx,
+                    lambda: self._invoke(reduce_chain, {
+                        "summaries_text": summaries_text,
+                        "user_prompt": prompt
+                    }, phase="reduce")
+                )
         
-        reduced = []
-        batch_size = 5
+        tasks = [
+            asyncio.ensure_future(reduce_batch(i // fan_in, summaries[i:i + fan_in]))
+            for i in range(0, len(summaries), fan_in)
+        ]
         try:
-            for i in range(0, len(summaries), batch_size):
-                batch = summaries[i:i + batch_size]
-                summaries_text = "\n\n---\n\n".join(batch)
-                result = await reduce_chain.ainvoke({
-                    "summaries_text": summaries_text,
-                    "user_prompt": prompt
-                })
-                reduced.append(result)
-        except Exception as e:
-            raise LLMError(f"Summary reduction failed: {str(e)}")
+            done, _ = await asyncio.wait(
+                tasks, timeout=self._remaining(deadline), return_when=asyncio.FIRST_EXCEPTION
+            )
+            for task in done:
+                if task.exception() is not None:
+                    raise LLMError(f"Summary reduction failed: {str(task.exception())}")
+        finally:
+            # Past the deadline, after a failure or when cancelled
+            for task in tasks:
+                task.cancel()
         
-        return reduced
+        return {idx: task.result() for idx, task in enumerate(tasks) if task in done}
     
-    async def _final_reduce(self, summaries: List[str], prompt: str) -> str:
+    async def _final_reduce(
+        self,
+        summaries: List[str],
+        prompt: str,
+        checkpoints: Optional[RunCheckpoints] = None
+    ) -> str:
         """Final reduction to produce the analysis result."""
-        final_prompt = ChatPromptTemplate.from_messages([
+        final_chain = self._build_chain([
             ("system", """You are an experienced open-source maintainer providing the final analysis.
 Synthesize all insights into a clear, actionable response.
 Be specific about patterns, priorities, and recommendations."""),
@@ -185,18 +540,28 @@ Include:
 3. Specific recommendations for maintainers""")
         ])
         
-        final_chain = final_prompt | self.llm | StrOutputParser()
-        
         try:
             summaries_text = "\n\n---\n\n".join(summaries)
-            result = await final_chain.ainvoke({
+            result = await self._checkpointed(checkpoints, "final", 0, lambda: self._invoke(final_chain, {
                 "summaries_text": summaries_text,
                 "user_prompt": prompt
-            })
+            }, phase="final"))
             return result
         except Exception as e:
             raise LLMError(f"Final analysis failed: {str(e)}")
 
 
-# Singleton instance
-llm_client = LLMClient()
+# Singleton instance, built by init_llm_client() in the app lifespan
+_llm_client: Optional[LLMClient] = None
+
+
+def init_llm_client() -> LLMClient:
+    """Build the shared LLM client (cheap: the chat model itself is created on first use)."""
+    global _llm_client
+    _llm_client = LLMClient(summary_store=coordination_repository)
+    return _llm_client
+
+
+def get_llm_client() -> LLMClient:
+    """Return the shared LLM client, building it if the lifespan hook has not run (e.g. scripts)."""
+    return _llm_client or init_llm_client()
@@ -0,0 +1,156 @@
+"""Analysis planner - fits an analysis into latency and token budgets."""
+
+import math
+from dataclasses import dataclass
+from itertools import accumulate
+from typing import List, Optional, Tuple
+
+from app.clients.llm_stats import LLMCallStats
+from app.exceptions import AnalysisBudgetExceededError
+
+# Issue sets up to this size are analyzed in one direct call
+DIRECT_LIMIT = 20
+# Preferred first: smaller chunks and fan-ins keep more detail per call
+CHUNK_SIZES = (25, 50, 100)
+FAN_INS = (5, 10)
+# Share of the latency budget a plan may fill; the rest absorbs latency variance
+LATENCY_SAFETY = 0.8
+# Formatted issue overhead besides title, body and URL ("Title: ", "Created: ", separators, ...)
+DOCUMENT_OVERHEAD_CHARS = 80
+
+
+@dataclass
+class AnalysisPlan:
+    """How an analysis is run: which issues, and how the map-reduce is shaped."""
+    issue_count: int
+    chunk_size: int
+    concurrency: int
+    fan_in: int
+    estimated_seconds: float
+    estimated_tokens: float
+    
+    @property
+    def direct(self) -> bool:
+        """Whether the issues fit in a single direct call."""
+        return self.issue_count <= DIRECT_LIMIT
+    
+    @property
+    def key(self) -> str:
+        """Identifies the plan's output (concurrency does not change it)."""
+        if self.direct:
+            return f"{self.issue_count}"
+        return f"{self.issue_count}:{self.chunk_size}:{self.fan_in}"
+
+
+def document_chars(issue: dict) -> int:
+    """Size of an issue once formatted for the LLM (bodies are cut at 500 characters)."""
+    body = issue.get("body", "") or ""
+    return (
+        len(issue.get("title", "")) + min(len(body), 503) + len(issue.get("html_url", ""))
+        + len(issue.get("created_at", "")) + DOCUMENT_OVERHEAD_CHARS
+    )
+
+
+def reduce_cost(
+    summaries: int,
+    fan_in: int,
+    concurrency: int,
+    stats: LLMCallStats,
+    summary_tokens: float
+) -> Tuple[float, float]:
+    """Expected (seconds, tokens) of the reduce levels and final call for `summaries` map outputs."""
+    seconds = 0.0
+    tokens = 0.0
+    while summaries > fan_in:
+        calls = math.ceil(summaries / fan_in)
+        reduce_chars = stats.chars_for_tokens(fan_in * summary_tokens)
+        seconds += math.ceil(calls / concurrency) * stats.latency("reduce", reduce_chars)
+        tokens += summaries * summary_tokens + calls * stats.output_tokens("reduce")
+        summaries = calls
+        summary_tokens = stats.output_tokens("reduce")
+    seconds += stats.latency("final", stats.chars_for_tokens(summaries * summary_tokens))
+    tokens += summaries * summary_tokens + stats.output_tokens("final")
+    return seconds, tokens
+
+
+def estimate(
+    prefix_chars: List[int],
+    issue_count: int,
+    chunk_size: int,
+    concurrency: int,
+    fan_in: int,
+    stats: LLMCallStats
+) -> Tuple[float, float]:
+    """Expected (seconds, tokens) to analyze the first `issue_count` issues with this shape."""
+    input_tokens = stats.tokens_for_chars(prefix_chars[issue_count])
+    if issue_count <= DIRECT_LIMIT:
+        return stats.latency("direct", prefix_chars[issue_count]), input_tokens + stats.output_tokens("direct")
+    
+    maps = math.ceil(issue_count / chunk_size)
+    seconds = math.ceil(maps / concurrency) * stats.latency("map", prefix_chars[issue_count] // maps)
+    tokens = input_tokens + maps * stats.output_tokens("map")
+    reduce_seconds, reduce_tokens = reduce_cost(maps, fan_in, concurrency, stats, stats.output_tokens("map"))
+    return seconds + reduce_seconds, tokens + reduce_tokens
+
+
+def plan_analysis(
+    issues: List[dict],
+    latency_budget: Optional[float],
+    token_budget: Optional[int],
+    stats: LLMCallStats,
+    max_concurrency: int
+) -> AnalysisPlan:
+    """
+    Pick the plan that analyzes the most issues (most recent first) within the budgets.
+
+    Among plans covering the same issues, smaller chunks and fan-ins and fewer concurrent
+    calls are preferred. If not even one issue fits the latency budget, a direct call with
+    as many issues as fit the token budget is returned and the deadline decides how far it
+    gets (a direct call takes about as long for one issue as for DIRECT_LIMIT).
+
+    Raises:
+        AnalysisBudgetExceededError: If not even one issue fits the token budget
+    """
+    prefix_chars = [0, *accumulate(document_chars(issue) for issue in issues)]
+    time_limit = latency_budget * LATENCY_SAFETY if latency_budget is not None else math.inf
+    token_limit = token_budget if token_budget is not None else math.inf
+    concurrencies = sorted({c for c in (1, 2, 4, 8, 16, 32) if c < max_concurrency} | {max_concurrency})
+    
+    def fits(count: int, chunk_size: int, concurrency: int, fan_in: int) -> bool:
+        seconds, tokens = estimate(prefix_chars, count, chunk_size, concurrency, fan_in, stats)
+        return seconds <= time_limit and tokens <= token_limit
+    
+    def largest_fit(low: int, high: int, *shape: int) -> int:
+        """Largest count in [low, high] that fits (cost grows with the count), or low - 1."""
+        best = low - 1
+        while low <= high:
+            middle = (low + high) // 2
+            if fits(middle, *shape):
+                best, low = middle, middle + 1
+            else:
+                high = middle - 1
+        return best
+    
+    best: Optional[AnalysisPlan] = None
+    for chunk_size in CHUNK_SIZES:
+        for fan_in in FAN_INS:
+            for concurrency in concurrencies:
+                shape = (chunk_size, concurrency, fan_in)
+                count = largest_fit(DIRECT_LIMIT + 1, len(issues), *shape)
+                if count <= DIRECT_LIMIT:
+                    count = largest_fit(1, min(len(issues), DIRECT_LIMIT), *shape)
+                if count >= 1 and (best is None or count > best.issue_count):
+                    seconds, tokens = estimate(prefix_chars, count, *shape, stats)
+                    best = AnalysisPlan(count, chunk_size, concurrency, fan_in, seconds, tokens)
+    
+    if best is None:
+        count = 0
+        for candidate in range(min(len(issues), DIRECT_LIMIT), 0, -1):
+            if estimate(prefix_chars, candidate, CHUNK_SIZES[0], 1, FAN_INS[0], stats)[1] <= token_limit:
+                count = candidate
+                break
+        if count == 0:
+            raise AnalysisBudgetExceededError("Token budget too small to analyze a single issue")
+        seconds, tokens = estimate(prefix_chars, count, CHUNK_SIZES[0], 1, FAN_INS[0], stats)
+        best = AnalysisPlan(count, CHUNK_SIZES[0], 1, FAN_INS[0], seconds, tokens)
+    return best
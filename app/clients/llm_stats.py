@@ -0,0 +1,100 @@
+"""Running LLM call statistics, used to plan analyses within latency and token budgets."""
+
+from typing import Dict, Optional, Set
+
+# Cold-start estimates, used until calls of a phase have been observed
+DEFAULT_LATENCY = {"direct": 15.0, "map": 8.0, "reduce": 10.0, "final": 15.0}
+DEFAULT_OUTPUT_TOKENS = {"direct": 800.0, "map": 400.0, "reduce": 550.0, "final": 800.0}
+DEFAULT_CHARS_PER_TOKEN = 4.0
+
+
+class LLMCallStats:
+    """
+    Per-phase latency, input and output size of LLM calls, plus the input chars-per-token ratio.
+    Exponentially weighted, so estimates follow provider slowdowns within a few calls.
+    """
+    
+    def __init__(self, alpha: float = 0.2):
+        self.alpha = alpha
+        self._latency: Dict[str, float] = dict(DEFAULT_LATENCY)
+        self._output_tokens: Dict[str, float] = dict(DEFAULT_OUTPUT_TOKENS)
+        self._input_chars: Dict[str, float] = {}
+        self._chars_per_token = DEFAULT_CHARS_PER_TOKEN
+        self._observed: Set[str] = set()
+    
+    def _update(self, current: float, value: float, first: bool) -> float:
+        return value if first else current + self.alpha * (value - current)
+    
+    def observe(self, phase: str, seconds: float, input_chars: int, input_tokens: int, output_tokens: int) -> None:
+        """Record one completed call (token counts are 0 if the model did not report usage)."""
+        first = phase not in self._observed
+        self._latency[phase] = self._update(self._latency.get(phase, seconds), seconds, first)
+        if output_tokens:
+            self._output_tokens[phase] = self._update(
+                self._output_tokens.get(phase, output_tokens), output_tokens, first
+            )
+        if input_chars:
+            self._input_chars[phase] = self._update(self._input_chars.get(phase, input_chars), input_chars, first)
+        if input_tokens and input_chars:
+            self._chars_per_token = self._update(
+                self._chars_per_token, input_chars / input_tokens, not self._observed
+            )
+        self._observed.add(phase)
+    
+    def observe_cancelled(self, phase: str, seconds: float, input_chars: int) -> None:
+        """
+        Record a call cancelled after `seconds` (e.g. at a deadline): it would have taken
+        at least that long, so the phase's estimate is raised to it if it was lower.
+        """
+        if seconds <= self.latency(phase, input_chars):
+            return
+        self._latency[phase] = seconds
+        if input_chars:
+            self._input_chars[phase] = input_chars
+        self._observed.add(phase)
+    
+    def latency(self, phase: str, input_chars: Optional[int] = None) -> float:
+        """
+        Expected seconds per call of a phase with `input_chars` of input. Observed phases
+        take longer for inputs larger than the observed ones (but not shorter for smaller
+        ones, as output dominates short calls). Phases not observed yet take their default
+        scaled by how fast the observed phases ran compared to theirs, or what the observed
+        phases took per input char, whichever is slower.
+        """
+        if not self._observed:
+            return self._latency.get(phase, DEFAULT_LATENCY["final"])
+        if phase in self._observed:
+            seconds = self._latency[phase]
+            if input_chars and self._input_chars.get(phase):
+                seconds *= max(1.0, input_chars / self._input_chars[phase])
+            return seconds
+        speed = sum(
+            self._latency[observed] / DEFAULT_LATENCY.get(observed, DEFAULT_LATENCY["final"])
+            for observed in self._observed
+        ) / len(self._observed)
+        seconds = DEFAULT_LATENCY.get(phase, DEFAULT_LATENCY["final"]) * speed
+        
+        # Larger inputs take longer: a map call over 100 issues is slower than a direct call over 20
+        sized = [observed for observed in self._observed if self._input_chars.get(observed)]
+        if input_chars and sized:
+            seconds_per_char = sum(
+                self._latency[observed] / self._input_chars[observed] for observed in sized
+            ) / len(sized)
+            seconds = max(seconds, seconds_per_char * input_chars)
+        return seconds
+    
+    def output_tokens(self, phase: str) -> float:
+        """Expected output tokens per call of a phase."""
+        return self._output_tokens.get(phase, DEFAULT_OUTPUT_TOKENS["final"])
+    
+    def tokens_for_chars(self, chars: int) -> float:
+        """Expected input tokens for prompt text of this many characters."""
+        return chars / self._chars_per_token
+    
+    def chars_for_tokens(self, tokens: float) -> int:
+        """Expected characters of prompt text with this many tokens."""
+        return int(tokens * self._chars_per_token)
+
+
+# Shared by every analysis in this process
+llm_call_stats = LLMCallStats()
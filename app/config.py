@@ -17,6 +17,34 @@ class Settings:
     # LLM settings
     LLM_MODEL: str = os.getenv("LLM_MODEL", "gpt-3.5-turbo")
     MAX_ISSUES_PER_CHUNK: int = int(os.getenv("MAX_ISSUES_PER_CHUNK", "20"))
+    LLM_MAX_CONCURRENCY: int = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))  # calls in flight per budgeted analysis or per batch stage
+    
+    # Cache settings
+    CACHE_MAX_BYTES: int = int(os.getenv("CACHE_MAX_BYTES", "0"))  # 0 = unbounded
+    BODY_COMPRESSION_LEVEL: int = int(os.getenv("BODY_COMPRESSION_LEVEL", "6"))
+    DB_BUSY_TIMEOUT_SECONDS: float = float(os.getenv("DB_BUSY_TIMEOUT_SECONDS", "30"))
+    
+    # Multi-worker coordination
+    SCAN_LEASE_TTL_SECONDS: int = int(os.getenv("SCAN_LEASE_TTL_SECONDS", "600"))
+    SHARED_CACHE_TTL_SECONDS: int = int(os.getenv("SHARED_CACHE_TTL_SECONDS", "86400"))
+    ANALYSIS_RUN_STALE_SECONDS: int = int(os.getenv("ANALYSIS_RUN_STALE_SECONDS", "300"))  # running runs without progress may be resumed
+    JOB_RETENTION_SECONDS: int = int(os.getenv("JOB_RETENTION_SECONDS", "604800"))  # finished jobs are deleted after this
+    EXPIRY_SWEEP_INTERVAL_SECONDS: int = int(os.getenv("EXPIRY_SWEEP_INTERVAL_SECONDS", "600"))
+    
+    # GitHub webhooks
+    GITHUB_WEBHOOK_SECRET: str = os.getenv("GITHUB_WEBHOOK_SECRET", "")  # empty = webhooks rejected
+    WEBHOOK_BATCH_WINDOW_MS: float = float(os.getenv("WEBHOOK_BATCH_WINDOW_MS", "50"))
+    WEBHOOK_BATCH_MAX: int = int(os.getenv("WEBHOOK_BATCH_MAX", "500"))
+    
+    # Snapshot export/import
+    SNAPSHOT_BATCH_SIZE: int = int(os.getenv("SNAPSHOT_BATCH_SIZE", "2000"))  # rows per fetch/insert batch
+    
+    # Diagnostics
+    ADMIN_TOKEN: str = os.getenv("ADMIN_TOKEN", "")  # empty = profiling and snapshot imports disabled
+    PROFILE_SAMPLE_INTERVAL_MS: float = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", "5"))
+    LOOP_MONITOR_ENABLED: bool = os.getenv("LOOP_MONITOR_ENABLED", "true").lower() == "true"
+    LOOP_MONITOR_INTERVAL_MS: float = float(os.getenv("LOOP_MONITOR_INTERVAL_MS", "100"))
+    LOOP_BLOCK_THRESHOLD_MS: float = float(os.getenv("LOOP_BLOCK_THRESHOLD_MS", "100"))
 
 
 settings = Settings()
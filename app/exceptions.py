@@ -1,5 +1,7 @@
 """Custom exceptions for the application."""
 
+from typing import Optional
+
 
 class AppException(Exception):
     """Base exception for the application."""
@@ -20,6 +22,12 @@ class LLMError(AppException):
         super().__init__(message, status_code=500)
 
 
+class AnalysisBudgetExceededError(LLMError):
+    """Exception when a latency or token budget is too small for any analysis to be produced."""
+    def __init__(self, message: str):
+        AppException.__init__(self, message, status_code=504)
+
+
 class RepositoryNotFoundError(AppException):
     """Exception when repository is not found in cache."""
     def __init__(self, repo: str):
@@ -31,8 +39,51 @@ class RepositoryNotFoundError(AppException):
 
 class NoIssuesFoundError(AppException):
     """Exception when no issues are found for a repository."""
+    def __init__(self, repo: str, issue_filter: Optional[str] = None):
+        if issue_filter:
+            message = f"No cached issues of repository '{repo}' match the filter '{issue_filter}'."
+        else:
+            message = f"No issues found for repository '{repo}'. The repository may have no open issues."
+        super().__init__(message, status_code=400)
+
+
+class InvalidFilterError(AppException):
+    """Exception when an issue filter expression cannot be parsed."""
+    def __init__(self, message: str):
+        super().__init__(message, status_code=400)
+
+
+class ScanInProgressError(AppException):
+    """Exception when another worker is already scanning the repository."""
     def __init__(self, repo: str):
         super().__init__(
-            f"No issues found for repository '{repo}'. The repository may have no open issues.",
-            status_code=400
+            f"Repository '{repo}' is already being scanned. Please retry when the scan finishes.",
+            status_code=409
         )
+
+
+class JobNotFoundError(AppException):
+    """Exception when a job does not exist."""
+    def __init__(self, job_id: str):
+        super().__init__(f"Job '{job_id}' not found", status_code=404)
+
+
+class JobNotResumableError(AppException):
+    """Exception when a job is still running and making progress."""
+    def __init__(self, job_id: str):
+        super().__init__(
+            f"Job '{job_id}' is still running. Only failed or stalled jobs can be resumed.",
+            status_code=409
+        )
+
+
+class WebhookSignatureError(AppException):
+    """Exception when a webhook delivery cannot be authenticated."""
+    def __init__(self, message: str):
+        super().__init__(message, status_code=401)
+
+
+class SnapshotFormatError(AppException):
+    """Exception when an imported snapshot cannot be parsed."""
+    def __init__(self, message: str):
+        super().__init__(message, status_code=400)
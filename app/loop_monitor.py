@@ -0,0 +1,95 @@
+"""Event-loop lag monitor that reports the stack of callbacks blocking the loop."""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+from typing import List, Optional
+
+from app.metrics import EVENT_LOOP_BLOCKED, EVENT_LOOP_BLOCK_DURATION, EVENT_LOOP_LAG
+from app.profiling import frame_stack
+
+logger = logging.getLogger(__name__)
+
+
+def _blocking_site(stack: List[str]) -> str:
+    """Pick the innermost application frame as the metric label (falls back to the innermost frame)."""
+    for entry in reversed(stack):
+        if entry.startswith("app."):
+            return entry.rsplit(":", 1)[0]
+    return stack[-1].rsplit(":", 1)[0] if stack else "unknown"
+
+
+class LoopMonitor:
+    """
+    Measures event-loop lag with a heartbeat task and watches for blocking from a thread.
+    
+    The heartbeat sleeps for `interval` and records how late it wakes up. A watchdog
+    thread notices when the heartbeat has not ticked for `interval + threshold`,
+    captures the loop thread's stack once per blocking episode, and logs it.
+    """
+    
+    def __init__(self, interval: float = 0.1, threshold: float = 0.1):
+        self.interval = interval
+        self.threshold = threshold
+        self._last_tick = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stop = threading.Event()
+        self._watchdog = threading.Thread(target=self._watch, name="loop-monitor", daemon=True)
+    
+    async def _heartbeat(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            EVENT_LOOP_LAG.observe(max(0.0, now - expected))
+            self._last_tick = now
+    
+    def _watch(self) -> None:
+        blocked_since: Optional[float] = None
+        while not self._stop.wait(self.interval / 2):
+            last_tick = self._last_tick
+            stalled = time.monotonic() - last_tick - self.interval
+            
+            if stalled <= self.threshold:
+                if blocked_since is not None:
+                    duration = last_tick - blocked_since
+                    EVENT_LOOP_BLOCK_DURATION.observe(duration)
+                    logger.warning(f"Event loop unblocked after {duration * 1000:.0f} ms")
+                    blocked_since = None
+                continue
+            
+            if blocked_since is None:
+                blocked_since = last_tick + self.interval
+                frame = sys._current_frames().get(self._loop_thread_id)
+                stack = frame_stack(frame, with_lines=True)
+                EVENT_LOOP_BLOCKED.labels(_blocking_site(stack)).inc()
+                logger.warning(
+                    f"Event loop blocked for over {stalled * 1000:.0f} ms, current stack:\n  "
+                    + "\n  ".join(stack)
+                )
+    
+    def start(self) -> None:
+        """Start monitoring the running event loop (call from inside it)."""
+        self._loop_thread_id = threading.get_ident()
+        self._last_tick = time.monotonic()
+        self._task = asyncio.get_running_loop().create_task(self._heartbeat())
+        self._watchdog.start()
+        logger.info(
+            f"Event loop monitor started (interval {self.interval * 1000:.0f} ms, "
+            f"threshold {self.threshold * 1000:.0f} ms)"
+        )
+    
+    async def stop(self) -> None:
+        """Stop the heartbeat task and the watchdog thread."""
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self._watchdog.is_alive():
+            self._watchdog.join()
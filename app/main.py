@@ -1,12 +1,22 @@
 """Main FastAPI application - App factory and configuration."""
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from contextlib import asynccontextmanager
 import logging
+import threading
+import time
 
 from app.routes import router
-from app.repositories import issue_repository
+from app.clients import init_github_client, init_llm_client
+from app.repositories import issue_repository, coordination_repository
+from app.config import settings
+from app.loop_monitor import LoopMonitor
+from app.metrics import HTTP_REQUESTS_IN_FLIGHT
+from app.profiling import SamplingProfiler
+from app.security import is_admin
+from app import timing
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -15,11 +25,28 @@ logger = logging.getLogger(__name__)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Initialize database on startup."""
+    """Initialize database and clients and start the event loop monitor on startup."""
     logger.info("Initializing database...")
     issue_repository.init_db()
+    coordination_repository.init_db()
     logger.info("Database initialized successfully")
+    
+    # Clients are built here rather than at import; the LLM stack loads on first /analyze
+    init_github_client()
+    init_llm_client()
+    
+    loop_monitor = None
+    if settings.LOOP_MONITOR_ENABLED:
+        loop_monitor = LoopMonitor(
+            interval=settings.LOOP_MONITOR_INTERVAL_MS / 1000,
+            threshold=settings.LOOP_BLOCK_THRESHOLD_MS / 1000
+        )
+        loop_monitor.start()
+    
     yield
+    
+    if loop_monitor is not None:
+        await loop_monitor.stop()
 
 
 # API Tags for documentation
@@ -31,6 +58,22 @@ tags_metadata = [
     {
         "name": "Issues",
         "description": "Endpoints for fetching and analyzing GitHub issues"
+    },
+    {
+        "name": "Search",
+        "description": "Filtered listing and search of cached issues"
+    },
+    {
+        "name": "Jobs",
+        "description": "Scan and analysis jobs across all workers"
+    },
+    {
+        "name": "Webhooks",
+        "description": "GitHub webhook ingestion for real-time cache updates"
+    },
+    {
+        "name": "Snapshots",
+        "description": "NDJSON export and bulk import of the issue cache"
     }
 ]
 
@@ -76,6 +119,55 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+# Track in-flight requests for /metrics
+@app.middleware("http")
+async def track_in_flight(request, call_next):
+    """Count requests currently being served."""
+    HTTP_REQUESTS_IN_FLIGHT.inc()
+    try:
+        return await call_next(request)
+    finally:
+        HTTP_REQUESTS_IN_FLIGHT.dec()
+
+
+# Per-request timing breakdown, plus an admin-only sampling profile on request
+@app.middleware("http")
+async def server_timing(request: Request, call_next):
+    """
+    Report timed spans (service, repository and client layers) in a Server-Timing header.
+    With 'X-Profile: 1' and a valid admin token, the response body is replaced by
+    a folded-stack profile of the request, ready for flame graph tools.
+    """
+    profiler = None
+    if request.headers.get("X-Profile") == "1":
+        if not is_admin(request):
+            return JSONResponse(status_code=403, content={"detail": "Profiling requires a valid admin token"})
+        profiler = SamplingProfiler(threading.get_ident(), settings.PROFILE_SAMPLE_INTERVAL_MS / 1000)
+        profiler.start()
+    
+    timing.begin_request()
+    start = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        if profiler is not None:
+            profiler.stop()
+    header = timing.server_timing_header(time.perf_counter() - start)
+    
+    if profiler is not None:
+        # Discard the real body; its status is kept in a header
+        async for _ in response.body_iterator:
+            pass
+        response = PlainTextResponse(
+            profiler.folded(),
+            headers={"X-Profiled-Status": str(response.status_code)}
+        )
+    
+    response.headers["Server-Timing"] = header
+    return response
+
+
 # Include all routes
 app.include_router(router)
 
@@ -0,0 +1,63 @@
+"""Prometheus metrics for the hot paths (GitHub, SQLite, LLM, HTTP)."""
+
+from prometheus_client import Counter, Gauge, Histogram
+
+# GitHub API
+GITHUB_PAGE_LATENCY = Histogram(
+    "github_page_latency_seconds",
+    "Latency of a single GitHub issues page request",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+)
+GITHUB_PAGES_PER_SCAN = Histogram(
+    "github_pages_per_scan",
+    "Number of GitHub pages requested per repository scan",
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+)
+
+# SQLite
+DB_LATENCY = Histogram(
+    "sqlite_latency_seconds",
+    "Time spent in SQLite per IssueRepository method call, split into query and commit",
+    ["method", "operation"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+)
+
+# LLM
+LLM_CALL_LATENCY = Histogram(
+    "llm_call_latency_seconds",
+    "Latency of a single LLM call by analysis phase",
+    ["phase"],
+    buckets=(0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+)
+LLM_TOKENS = Counter(
+    "llm_tokens_total",
+    "Tokens sent to and received from the LLM",
+    ["direction"]
+)
+LLM_REQUESTS_IN_FLIGHT = Gauge(
+    "llm_requests_in_flight",
+    "LLM calls currently awaiting a response"
+)
+
+# Event loop
+EVENT_LOOP_LAG = Histogram(
+    "event_loop_lag_seconds",
+    "How late the event loop heartbeat woke up",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+EVENT_LOOP_BLOCKED = Counter(
+    "event_loop_blocked_total",
+    "Times the event loop was blocked past the threshold, by innermost application frame",
+    ["site"]
+)
+EVENT_LOOP_BLOCK_DURATION = Histogram(
+    "event_loop_block_duration_seconds",
+    "Duration of event loop blocking episodes",
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+)
+
+# HTTP
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being served"
+)
@@ -0,0 +1,52 @@
+"""Sampling profiler producing flame-graph-ready folded stacks."""
+
+import sys
+import threading
+from collections import Counter
+from types import FrameType
+from typing import List, Optional
+
+
+def frame_stack(frame: Optional[FrameType], with_lines: bool = False) -> List[str]:
+    """Describe a frame and its callers, outermost first, as 'module:function' (plus ':line')."""
+    stack = []
+    while frame is not None:
+        entry = f"{frame.f_globals.get('__name__', '?')}:{frame.f_code.co_name}"
+        if with_lines:
+            entry += f":{frame.f_lineno}"
+        stack.append(entry)
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+
+class SamplingProfiler:
+    """
+    Periodically samples the stack of one thread from a background thread.
+    Output is in the folded format ('frame;frame;frame count') read by
+    flamegraph.pl, speedscope and inferno.
+    """
+    
+    def __init__(self, thread_id: int, interval: float = 0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+    
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.samples[";".join(frame_stack(frame))] += 1
+    
+    def start(self) -> None:
+        self._thread.start()
+    
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+    
+    def folded(self) -> str:
+        """Return the collected samples as folded stacks, heaviest first."""
+        return "\n".join(f"{stack} {count}" for stack, count in self.samples.most_common()) + "\n"
@@ -1,5 +1,14 @@
 """Repositories package - Data access layer."""
 
 from app.repositories.issue_repository import IssueRepository, issue_repository
+from app.repositories.coordination_repository import CoordinationRepository, coordination_repository
+from app.repositories.issue_filter import IssueFilter, parse_filter
 
-__all__ = ["IssueRepository", "issue_repository"]
+__all__ = [
+    "IssueRepository",
+    "issue_repository",
+    "CoordinationRepository",
+    "coordination_repository",
+    "IssueFilter",
+    "parse_filter"
+]
@@ -0,0 +1,90 @@
+"""SQLite connection factory with cheap per-method timing."""
+
+import sqlite3
+import time
+from datetime import datetime, timedelta, timezone
+
+from app.config import settings
+from app.metrics import DB_LATENCY
+from app import timing
+
+
+class _TimedCursor(sqlite3.Cursor):
+    """Cursor that adds the time spent executing and fetching to its connection."""
+    
+    def _timed(self, fn, *args):
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            self.connection.query_seconds += time.perf_counter() - start
+    
+    def execute(self, *args):
+        return self._timed(super().execute, *args)
+    
+    def executemany(self, *args):
+        return self._timed(super().executemany, *args)
+    
+    def fetchone(self):
+        return self._timed(super().fetchone)
+    
+    def fetchmany(self, *args):
+        return self._timed(super().fetchmany, *args)
+    
+    def fetchall(self):
+        return self._timed(super().fetchall)
+
+
+class TimedConnection(sqlite3.Connection):
+    """
+    Connection that records query and commit latency for the repository method using it.
+    Query time is accumulated per statement and observed once when the connection closes,
+    so per-row inserts cost a clock read rather than a histogram update.
+    """
+    
+    method = "unknown"
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.query_seconds = 0.0
+    
+    def cursor(self, factory=_TimedCursor):
+        return super().cursor(factory)
+    
+    def commit(self):
+        start = time.perf_counter()
+        try:
+            super().commit()
+        finally:
+            elapsed = time.perf_counter() - start
+            DB_LATENCY.labels(self.method, "commit").observe(elapsed)
+            timing.record(f"db.{self.method}.commit", elapsed)
+    
+    def close(self):
+        DB_LATENCY.labels(self.method, "query").observe(self.query_seconds)
+        timing.record(f"db.{self.method}", self.query_seconds)
+        self.query_seconds = 0.0
+        super().close()
+
+
+def connect(db_path: str, method: str, **kwargs) -> TimedConnection:
+    """
+    Open a timed connection whose metrics are labelled with the calling method.
+    Several worker processes share the file, so writers wait on locks instead of failing.
+    Extra keyword arguments are passed to sqlite3.connect.
+    """
+    conn = sqlite3.connect(
+        db_path, timeout=settings.DB_BUSY_TIMEOUT_SECONDS, factory=TimedConnection, **kwargs
+    )
+    conn.method = method
+    return conn
+
+
+def utc_now() -> str:
+    """Current UTC time as an ISO timestamp."""
+    return datetime.now(timezone.utc).isoformat()
+
+
+def utc_ago(seconds: float) -> str:
+    """UTC time `seconds` ago as an ISO timestamp, comparable with utc_now() values."""
+    return (datetime.now(timezone.utc) - timedelta(seconds=seconds)).isoformat()
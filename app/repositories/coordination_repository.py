@@ -0,0 +1,526 @@
+"""Coordination repository - cross-worker state shared through the SQLite file."""
+
+import os
+import socket
+import sqlite3
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
+import logging
+
+from app.config import settings
+from app.repositories.connection import connect, utc_ago, utc_now
+
+logger = logging.getLogger(__name__)
+
+# Identifies this worker process in leases and job records
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+
+class CoordinationRepository:
+    """
+    Repository for state shared between worker processes.
+
+    - Scan leases: at most one worker scans a repo at a time; leases expire
+      so a crashed worker cannot block a repo forever.
+    - Jobs: scan and analysis runs, visible to every worker.
+    - Analysis runs: the request behind an analysis job and its checkpointed
+      map/reduce outputs, so a failed or abandoned run can resume.
+    - Shared caches: final analysis results and per-chunk map summaries.
+    """
+    
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or settings.DATABASE_PATH
+        # init_db sweeps at startup; create_job sweeps again once this has passed
+        self._next_sweep = time.monotonic() + settings.EXPIRY_SWEEP_INTERVAL_SECONDS
+    
+    def _connect(self, method: str) -> sqlite3.Connection:
+        """Open a connection to the shared database, timed under the calling method's name."""
+        return connect(self.db_path, method)
+    
+    def init_db(self) -> None:
+        """Create coordination tables and drop expired shared cache entries and runs."""
+        conn = self._connect("init_db")
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS scan_leases (
+                repo TEXT PRIMARY KEY,
+                owner TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            )
+        ''')
+        
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                repo TEXT NOT NULL,
+                status TEXT NOT NULL,
+                owner TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL,
+                error TEXT
+            )
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_jobs_repo ON jobs(repo, created_at)
+        ''')
+        
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS analysis_results (
+                cache_key TEXT PRIMARY KEY,
+                repo TEXT NOT NULL,
+                result TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_analysis_results_repo ON analysis_results(repo)
+        ''')
+        
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS map_summaries (
+                cache_key TEXT PRIMARY KEY,
+                summary TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+        ''')
+        
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS analysis_runs (
+                job_id TEXT PRIMARY KEY,
+                prompt TEXT NOT NULL,
+                mode TEXT NOT NULL,
+                version INTEGER NOT NULL,
+                result TEXT,
+                issue_filter TEXT NOT NULL DEFAULT '',
+                cache_key TEXT
+            )
+        ''')
+        
+        # Runs recorded before analyses could be filtered, or results were shared
+        cursor.execute('PRAGMA table_info(analysis_runs)')
+        run_columns = [row[1] for row in cursor.fetchall()]
+        if 'issue_filter' not in run_columns:
+            cursor.execute("ALTER TABLE analysis_runs ADD COLUMN issue_filter TEXT NOT NULL DEFAULT ''")
+        if 'cache_key' not in run_columns:
+            cursor.execute('ALTER TABLE analysis_runs ADD COLUMN cache_key TEXT')
+        
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS run_checkpoints (
+                run_id TEXT NOT NULL,
+                stage TEXT NOT NULL,
+                idx INTEGER NOT NULL,
+                output TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (run_id, stage, idx)
+            )
+        ''')
+        
+        self._delete_expired(cursor)
+        
+        conn.commit()
+        conn.close()
+    
+    def _delete_expired(self, cursor: sqlite3.Cursor) -> None:
+        """
+        Drop shared cache entries older than SHARED_CACHE_TTL_SECONDS, expired scan leases,
+        and jobs (with their analysis runs and checkpoints) finished, failed or abandoned
+        more than JOB_RETENTION_SECONDS ago.
+        """
+        cutoff = time.time() - settings.SHARED_CACHE_TTL_SECONDS
+        cursor.execute('DELETE FROM analysis_results WHERE created_at < ?', (cutoff,))
+        cursor.execute('DELETE FROM map_summaries WHERE created_at < ?', (cutoff,))
+        cursor.execute('DELETE FROM run_checkpoints WHERE created_at < ?', (cutoff,))
+        cursor.execute('DELETE FROM scan_leases WHERE expires_at < ?', (time.time(),))
+        
+        finished = 'SELECT id FROM jobs WHERE updated_at < ?'
+        retention_cutoff = utc_ago(settings.JOB_RETENTION_SECONDS)
+        cursor.execute(f'DELETE FROM run_checkpoints WHERE run_id IN ({finished})', (retention_cutoff,))
+        cursor.execute(f'DELETE FROM analysis_runs WHERE job_id IN ({finished})', (retention_cutoff,))
+        cursor.execute(f'DELETE FROM jobs WHERE id IN ({finished})', (retention_cutoff,))
+    
+    # Scan leases
+    
+    def acquire_scan_lease(self, repo: str, ttl: Optional[int] = None) -> Optional[str]:
+        """
+        Try to take the scan lease for a repo.
+        Returns the lease token, or None if another scan holds an unexpired lease.
+        """
+        ttl = ttl or settings.SCAN_LEASE_TTL_SECONDS
+        token = f"{WORKER_ID}:{uuid.uuid4().hex}"
+        now = time.time()
+        conn = self._connect("acquire_scan_lease")
+        conn.isolation_level = None
+        cursor = conn.cursor()
+        
+        # IMMEDIATE takes the write lock up front, so check-and-take is atomic across processes
+        cursor.execute('BEGIN IMMEDIATE')
+        cursor.execute('SELECT expires_at FROM scan_leases WHERE repo = ?', (repo,))
+        row = cursor.fetchone()
+        acquired = row is None or row[0] < now
+        if acquired:
+            cursor.execute('''
+                INSERT INTO scan_leases (repo, owner, expires_at) VALUES (?, ?, ?)
+                ON CONFLICT(repo) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at
+            ''', (repo, token, now + ttl))
+        cursor.execute('COMMIT')
+        conn.close()
+        
+        return token if acquired else None
+    
+    def renew_scan_lease(self, repo: str, token: str, ttl: Optional[int] = None) -> bool:
+        """Extend a held scan lease by its TTL. Returns False if it expired and was taken over."""
+        ttl = ttl or settings.SCAN_LEASE_TTL_SECONDS
+        conn = self._connect("renew_scan_lease")
+        cursor = conn.cursor()
+        
+        cursor.execute(
+            'UPDATE scan_leases SET expires_at = ? WHERE repo = ? AND owner = ?',
+            (time.time() + ttl, repo, token)
+        )
+        renewed = cursor.rowcount == 1
+        
+        conn.commit()
+        conn.close()
+        
+        return renewed
+    
+    def release_scan_lease(self, repo: str, token: str) -> None:
+        """Release a scan lease (a no-op if it expired and was taken over)."""
+        conn = self._connect("release_scan_lease")
+        cursor = conn.cursor()
+        
+        cursor.execute(
+            'DELETE FROM scan_leases WHERE repo = ? AND owner = ?',
+            (repo, token)
+        )
+        
+        conn.commit()
+        conn.close()
+    
+    # Jobs
+    
+    def create_job(self, kind: str, repo: str) -> str:
+        """
+        Record a new running job owned by this worker. Returns the job id.
+        At most every EXPIRY_SWEEP_INTERVAL_SECONDS, also drops expired entries and jobs.
+        """
+        job_id = uuid.uuid4().hex
+        now = utc_now()
+        conn = self._connect("create_job")
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            INSERT INTO jobs (id, kind, repo, status, owner, created_at, updated_at)
+            VALUES (?, ?, ?, 'running', ?, ?, ?)
+        ''', (job_id, kind, repo, WORKER_ID, now, now))
+        
+        # Long-running workers sweep as they go, not only at startup
+        if time.monotonic() >= self._next_sweep:
+            self._next_sweep = time.monotonic() + settings.EXPIRY_SWEEP_INTERVAL_SECONDS
+            self._delete_expired(cursor)
+        
+        conn.commit()
+        conn.close()
+        
+        return job_id
+    
+    def finish_job(self, job_id: str, error: Optional[str] = None) -> None:
+        """Mark a job as succeeded, or failed with an error message."""
+        conn = self._connect("finish_job")
+        cursor = conn.cursor()
+        
+        cursor.execute(
+            'UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE id = ?',
+            ("failed" if error else "succeeded", error, utc_now(), job_id)
+        )
+        
+        conn.commit()
+        conn.close()
+    
+    def get_job(self, job_id: str) -> Optional[dict]:
+        """Retrieve a job by id."""
+        conn = self._connect("get_job")
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        cursor.execute('SELECT * FROM jobs WHERE id = ?', (job_id,))
+        row = cursor.fetchone()
+        conn.close()
+        
+        return dict(row) if row else None
+    
+    def list_jobs(self, repo: Optional[str] = None, status: Optional[str] = None, limit: int = 50) -> List[dict]:
+        """List the most recent jobs across all workers, optionally filtered."""
+        query = 'SELECT * FROM jobs WHERE 1 = 1'
+        params: list = []
+        if repo:
+            query += ' AND repo = ?'
+            params.append(repo)
+        if status:
+            query += ' AND status = ?'
+            params.append(status)
+        query += ' ORDER BY created_at DESC LIMIT ?'
+        params.append(limit)
+        
+        conn = self._connect("list_jobs")
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+        conn.close()
+        
+        return [dict(row) for row in rows]
+    
+    # Analysis runs
+    
+    def create_run(self, repo: str, prompt: str, mode: str, version: int, issue_filter: str = "") -> str:
+        """
+        Record a new analysis job together with its request. Returns the job id (= run id).
+        `issue_filter` is the canonical filter expression ('' for none).
+        """
+        job_id = self.create_job("analyze", repo)
+        conn = self._connect("create_run")
+        cursor = conn.cursor()
+        
+        cursor.execute(
+            'INSERT INTO analysis_runs (job_id, prompt, mode, version, issue_filter) VALUES (?, ?, ?, ?, ?)',
+            (job_id, prompt, mode, version, issue_filter)
+        )
+        
+        conn.commit()
+        conn.close()
+        
+        return job_id
+    
+    def get_run(self, job_id: str) -> Optional[dict]:
+        """Retrieve an analysis job with its request, result and checkpoint count."""
+        conn = self._connect("get_run")
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT jobs.*, analysis_runs.prompt, analysis_runs.mode, analysis_runs.version,
+                   COALESCE(analysis_runs.result, (
+                       SELECT result FROM analysis_results WHERE cache_key = analysis_runs.cache_key
+                   )) AS result,
+                   NULLIF(analysis_runs.issue_filter, '') AS "filter",
+                   (SELECT COUNT(*) FROM run_checkpoints WHERE run_id = jobs.id) AS checkpoints
+            FROM jobs JOIN analysis_runs ON analysis_runs.job_id = jobs.id
+            WHERE jobs.id = ?
+        ''', (job_id,))
+        row = cursor.fetchone()
+        conn.close()
+        
+        return dict(row) if row else None
+    
+    def claim_run(self, job_id: str) -> bool:
+        """
+        Take over a failed run, or a running one that made no progress for
+        ANALYSIS_RUN_STALE_SECONDS (its worker likely died). Returns whether it was claimed.
+        """
+        conn = self._connect("claim_run")
+        cursor = conn.cursor()
+        
+        # One UPDATE, so only one worker can win the claim
+        cursor.execute('''
+            UPDATE jobs SET status = 'running', owner = ?, error = NULL, updated_at = ?
+            WHERE id = ? AND (status = 'failed' OR (status = 'running' AND updated_at < ?))
+        ''', (WORKER_ID, utc_now(), job_id, utc_ago(settings.ANALYSIS_RUN_STALE_SECONDS)))
+        claimed = cursor.rowcount == 1
+        
+        conn.commit()
+        conn.close()
+        
+        return claimed
+    
+    def claim_resumable_run(
+        self,
+        repo: str,
+        prompt: str,
+        mode: str,
+        version: int,
+        issue_filter: str = ""
+    ) -> Optional[str]:
+        """Claim the latest resumable run of the same request, if any. Returns its job id."""
+        conn = self._connect("claim_resumable_run")
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT jobs.id FROM jobs JOIN analysis_runs ON analysis_runs.job_id = jobs.id
+            WHERE jobs.repo = ? AND analysis_runs.prompt = ? AND analysis_runs.mode = ?
+            AND analysis_runs.version = ? AND analysis_runs.issue_filter = ?
+            AND (jobs.status = 'failed' OR (jobs.status = 'running' AND jobs.updated_at < ?))
+            ORDER BY jobs.updated_at DESC LIMIT 1
+        ''', (repo, prompt, mode, version, issue_filter, utc_ago(settings.ANALYSIS_RUN_STALE_SECONDS)))
+        row = cursor.fetchone()
+        conn.close()
+        
+        if row and self.claim_run(row[0]):
+            return row[0]
+        return None
+    
+    def reset_run(self, job_id: str, version: int) -> None:
+        """Drop a run's checkpoints because the repo contents changed since they were made."""
+        conn = self._connect("reset_run")
+        cursor = conn.cursor()
+        
+        cursor.execute('DELETE FROM run_checkpoints WHERE run_id = ?', (job_id,))
+        cursor.execute('UPDATE analysis_runs SET version = ? WHERE job_id = ?', (version, job_id))
+        
+        conn.commit()
+        conn.close()
+    
+    def finish_run(self, job_id: str, cache_key: str) -> None:
+        """
+        Mark a run as succeeded and drop its checkpoints. Its result is stored once, in the
+        shared analysis results under `cache_key`; the run only points at it.
+        """
+        conn = self._connect("finish_run")
+        cursor = conn.cursor()
+        
+        cursor.execute(
+            'UPDATE analysis_runs SET result = NULL, cache_key = ? WHERE job_id = ?', (cache_key, job_id)
+        )
+        cursor.execute('DELETE FROM run_checkpoints WHERE run_id = ?', (job_id,))
+        
+        conn.commit()
+        conn.close()
+        self.finish_job(job_id)
+    
+    def get_checkpoints(self, run_id: str) -> Dict[Tuple[str, int], str]:
+        """Get the completed map/reduce outputs of a run, keyed by (stage, index)."""
+        conn = self._connect("get_checkpoints")
+        cursor = conn.cursor()
+        
+        cursor.execute('SELECT stage, idx, output FROM run_checkpoints WHERE run_id = ?', (run_id,))
+        rows = cursor.fetchall()
+        conn.close()
+        
+        return {(stage, idx): output for stage, idx, output in rows}
+    
+    def put_checkpoint(self, run_id: str, stage: str, idx: int, output: str) -> None:
+        """Store one completed map/reduce output; also marks the run as making progress."""
+        conn = self._connect("put_checkpoint")
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            INSERT OR REPLACE INTO run_checkpoints (run_id, stage, idx, output, created_at)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (run_id, stage, idx, output, time.time()))
+        cursor.execute('UPDATE jobs SET updated_at = ? WHERE id = ?', (utc_now(), run_id))
+        
+        conn.commit()
+        conn.close()
+    
+    # Shared analysis results
+    
+    def get_analysis(self, cache_key: str) -> Optional[str]:
+        """Get a cached analysis result, if present and not expired."""
+        conn = self._connect("get_analysis")
+        cursor = conn.cursor()
+        
+        cursor.execute(
+            'SELECT result FROM analysis_results WHERE cache_key = ? AND created_at >= ?',
+            (cache_key, time.time() - settings.SHARED_CACHE_TTL_SECONDS)
+        )
+        row = cursor.fetchone()
+        conn.close()
+        
+        return row[0] if row else None
+    
+    def put_analysis(self, cache_key: str, repo: str, result: str) -> None:
+        """Store an analysis result for other workers to reuse."""
+        conn = self._connect("put_analysis")
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            INSERT OR REPLACE INTO analysis_results (cache_key, repo, result, created_at)
+            VALUES (?, ?, ?, ?)
+        ''', (cache_key, repo, result, time.time()))
+        
+        conn.commit()
+        conn.close()
+    
+    def invalidate_repo(self, repo: str) -> None:
+        """Drop cached analysis results for a repo whose issues changed."""
+        conn = self._connect("invalidate_repo")
+        cursor = conn.cursor()
+        
+        cursor.execute('DELETE FROM analysis_results WHERE repo = ?', (repo,))
+        
+        conn.commit()
+        conn.close()
+    
+    # Shared map summaries
+    
+    def get_map_summaries(self, cache_keys: List[str]) -> Dict[str, str]:
+        """Get cached map-phase summaries for the given content keys."""
+        if not cache_keys:
+            return {}
+        
+        conn = self._connect("get_map_summaries")
+        cursor = conn.cursor()
+        
+        found = {}
+        cutoff = time.time() - settings.SHARED_CACHE_TTL_SECONDS
+        # Stay well under SQLite's bound-parameter limit
+        for i in range(0, len(cache_keys), 500):
+            batch = cache_keys[i:i + 500]
+            placeholders = ", ".join("?" * len(batch))
+            cursor.execute(
+                f'SELECT cache_key, summary FROM map_summaries '
+                f'WHERE cache_key IN ({placeholders}) AND created_at >= ?',
+                (*batch, cutoff)
+            )
+            found.update(cursor.fetchall())
+        conn.close()
+        
+        return found
+    
+    def put_map_summary(self, cache_key: str, summary: str) -> None:
+        """Store a map-phase summary for reuse by any worker."""
+        conn = self._connect("put_map_summary")
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            INSERT OR REPLACE INTO map_summaries (cache_key, summary, created_at)
+            VALUES (?, ?, ?)
+        ''', (cache_key, summary, time.time()))
+        
+        conn.commit()
+        conn.close()
+
+
+class RunCheckpoints:
+    """
+    Checkpoints of one analysis run.
+
+    Completed outputs are loaded once up front and looked up in memory;
+    new outputs are written through to the shared database.
+    """
+    
+    def __init__(self, repository: CoordinationRepository, run_id: str):
+        self.repository = repository
+        self.run_id = run_id
+        self.outputs: Dict[Tuple[str, int], str] = {}
+    
+    def load(self) -> None:
+        """Load the run's completed outputs."""
+        self.outputs = self.repository.get_checkpoints(self.run_id)
+    
+    def get(self, stage: str, idx: int) -> Optional[str]:
+        """Completed output of a step, if any."""
+        return self.outputs.get((stage, idx))
+    
+    def put(self, stage: str, idx: int, output: str) -> None:
+        """Persist the output of a completed step."""
+        self.repository.put_checkpoint(self.run_id, stage, idx, output)
+        self.outputs[(stage, idx)] = output
+
+
+# Singleton instance
+coordination_repository = CoordinationRepository()
@@ -0,0 +1,298 @@
+"""Issue filter expressions - compiled into SQL conditions on the issue cache."""
+
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.exceptions import InvalidFilterError
+
+MAX_TERMS = 20
+MAX_VALUES = 20
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+# [-]qualifier:value or free text; values with spaces are quoted
+TERM_PATTERN = re.compile(r'(-?)(?:([a-z]+):)?(?:"([^"]*)"|(\S+))')
+NUMBER_PATTERN = re.compile(r'^\d{1,9}$')
+DATE_PATTERN = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+DATETIME_PATTERN = re.compile(r'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}Z$')
+AGE_PATTERN = re.compile(r'^(\d+)([hdw])$')
+AGE_UNITS = {"h": "hours", "d": "days", "w": "weeks"}
+STATES = ("open", "closed")
+ONE_SECOND = timedelta(seconds=1)
+
+
+@dataclass(frozen=True)
+class FilterCondition:
+    """One term of a filter: its canonical text and the SQL it compiles to."""
+    canonical: str
+    sql: str
+    params: Tuple
+
+
+@dataclass(frozen=True)
+class IssueFilter:
+    """
+    A parsed filter expression; all conditions must match.
+
+    Relative dates are resolved when the expression is parsed, so the same
+    filter always selects the same issues of a repo version.
+    """
+    conditions: Tuple[FilterCondition, ...]
+    
+    @property
+    def key(self) -> str:
+        """
+        Canonical expression (sorted terms, absolute dates), e.g. for cache keys.
+        Parsing it again yields an equal filter.
+        """
+        return " ".join(condition.canonical for condition in self.conditions)
+    
+    def where(self) -> Tuple[str, list]:
+        """SQL condition on the `issues` table and its parameters ('' for an empty filter)."""
+        sql = " AND ".join(f"({condition.sql})" for condition in self.conditions)
+        params = [param for condition in self.conditions for param in condition.params]
+        return sql, params
+
+
+def _quote(value: str) -> str:
+    """Quote a value that would otherwise not parse back as the same term."""
+    return f'"{value}"' if re.search(r'\s|:', value) or value.startswith("-") else value
+
+
+def _values(qualifier: str, value: str, fold: bool = True) -> List[str]:
+    """Comma-separated alternatives of a term, e.g. label:bug,crash (lowercased if `fold`)."""
+    values = sorted({(v.strip().lower() if fold else v.strip()) for v in value.split(",") if v.strip()})
+    if not values:
+        raise InvalidFilterError(f"'{qualifier}:' needs a value")
+    if len(values) > MAX_VALUES:
+        raise InvalidFilterError(f"'{qualifier}:' accepts at most {MAX_VALUES} values")
+    return values
+
+
+def _in(column: str, values: List[str]) -> Tuple[str, Tuple]:
+    return f"{column} IN ({', '.join('?' for _ in values)})", tuple(values)
+
+
+def _member(table: str, column: str, qualifier: str, value: str) -> Tuple[str, str, Tuple]:
+    """Condition on a normalized metadata table (labels, assignees)."""
+    values = _values(qualifier, value)
+    sql, params = _in(column, values)
+    return f"{qualifier}:{_quote(','.join(values))}", f"issues.id IN (SELECT issue_id FROM {table} WHERE {sql})", params
+
+
+def _text(qualifier: str, value: str, now: datetime) -> Tuple[str, str, Tuple]:
+    """Free text matches issue titles, case-insensitively for ASCII letters."""
+    escaped = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return _quote(value), "issues.title LIKE ? ESCAPE '\\'", (f"%{escaped}%",)
+
+
+def _label(qualifier: str, value: str, now: datetime) -> Tuple[str, str, Tuple]:
+    return _member("issue_labels", "label", qualifier, value)
+
+
+def _assignee(qualifier: str, value: str, now: datetime) -> Tuple[str, str, Tuple]:
+    return _member("issue_assignees", "login", qualifier, value)
+
+
+def _milestone(qualifier: str, value: str, now: datetime) -> Tuple[str, str, Tuple]:
+    values = _values(qualifier, value)
+    sql, params = _in("issues.milestone", values)
+    return f"milestone:{_quote(','.join(values))}", sql, params
+
+
+def _state(qualifier: str, value: str, now: datetime) -> Tuple[str, str, Tuple]:
+    values = _values(qualifier, value)
+    if any(v not in STATES for v in values):
+        raise InvalidFilterError("'state:' must be 'open' or 'closed'")
+    sql, params = _in("issues.state", values)
+    return f"state:{','.join(values)}", sql, params
+
+
+def _repo(qualifier: str, value: str, now: datetime) -> Tuple[str, str, Tuple]:
+    values = _values(qualifier, value, fold=False)
+    sql, params = _in("issues.repo", values)
+    return f"repo:{','.join(values)}", sql, params
+
+
+def _no(qualifier: str, value: str, now: datetime) -> Tuple[str, str, Tuple]:
+    conditions = {
+        "label": "issues.id NOT IN (SELECT issue_id FROM issue_labels)",
+        "assignee": "issues.id NOT IN (SELECT issue_id FROM issue_assignees)",
+        "milestone": "issues.milestone IS NULL",
+    }
+    if value not in conditions:
+        raise InvalidFilterError("'no:' must be 'label', 'assignee' or 'milestone'")
+    return f"no:{value}", conditions[value], ()
+
+
+def _split_range(qualifier: str, value: str) -> List[Tuple[str, str]]:
+    """Split `>v`, `>=v`, `<v`, `<=v`, `v` or `a..b` into (operator, operand) bounds."""
+    if ".." in value:
+        low, high = value.split("..", 1)
+        bounds = []
+        if low != "*":
+            bounds.append((">=", low))
+        if high != "*":
+            bounds.append(("<=", high))
+        if not bounds:
+            raise InvalidFilterError(f"'{qualifier}:' range needs at least one bound")
+        return bounds
+    for operator in (">=", "<=", ">", "<"):
+        if value.startswith(operator):
+            return [(operator, value[len(operator):])]
+    return [("=", value)]
+
+
+def _range_condition(qualifier: str, column: str, low, high, render: Callable) -> Tuple[str, str, Tuple]:
+    """Inclusive bounds as canonical text and SQL."""
+    if low is not None and high is not None:
+        if low > high:
+            raise InvalidFilterError(f"'{qualifier}:' range is empty")
+        return f"{qualifier}:{render(low)}..{render(high)}", f"{column} BETWEEN ? AND ?", (render(low), render(high))
+    if low is not None:
+        return f"{qualifier}:>={render(low)}", f"{column} >= ?", (render(low),)
+    return f"{qualifier}:<={render(high)}", f"{column} <= ?", (render(high),)
+
+
+def _number(qualifier: str, value: str, now: datetime) -> Tuple[str, str, Tuple]:
+    """Counts (comments, reactions); all bounds are normalized to inclusive ones."""
+    low = high = None
+    for operator, operand in _split_range(qualifier, value):
+        if not NUMBER_PATTERN.match(operand):
+            raise InvalidFilterError(f"'{qualifier}:' expects a number, e.g. {qualifier}:>5 or {qualifier}:1..10")
+        number = int(operand)
+        if operator in (">=", ">", "="):
+            low = number + 1 if operator == ">" else number
+        if operator in ("<=", "<", "="):
+            high = number - 1 if operator == "<" else number
+    return _range_condition(qualifier, f"issues.{qualifier}", low, high, int)
+
+
+def _render_timestamp(moment: datetime) -> str:
+    """GitHub timestamp format (years always have four digits, unlike strftime's %Y)."""
+    return moment.replace(tzinfo=None).isoformat(timespec="seconds") + "Z"
+
+
+def _timestamp(qualifier: str, operand: str) -> Tuple[datetime, datetime]:
+    """First and last second an absolute date or timestamp stands for."""
+    try:
+        if DATE_PATTERN.match(operand):
+            start = datetime.strptime(operand, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+            return start, start + timedelta(days=1) - ONE_SECOND
+        if DATETIME_PATTERN.match(operand):
+            moment = datetime.strptime(operand, TIMESTAMP_FORMAT).replace(tzinfo=timezone.utc)
+            return moment, moment
+    except ValueError:
+        pass
+    raise InvalidFilterError(
+        f"'{qualifier}:' expects a date (YYYY-MM-DD), a timestamp (YYYY-MM-DDTHH:MM:SSZ) "
+        f"or an age such as <30d, e.g. {qualifier}:>2024-01-01"
+    )
+
+
+def _date(qualifier: str, value: str, now: datetime) -> Tuple[str, str, Tuple]:
+    """
+    Dates compare as GitHub timestamps. Ages (`h`, `d`, `w`) count back from now:
+    `updated:<30d` means updated less than 30 days ago. Ages resolve to their unit
+    (hours to the hour, days and weeks to the UTC day), so the same expression keeps
+    selecting the same issues, and keying the same cached or resumable analysis, until then.
+    """
+    low = high = None
+    for operator, operand in _split_range(qualifier, value):
+        age = AGE_PATTERN.match(operand)
+        if age:
+            if ".." in value:
+                raise InvalidFilterError(f"'{qualifier}:' ranges take dates, not ages")
+            if operator == "=":
+                raise InvalidFilterError(f"'{qualifier}:' ages need a comparison, e.g. {qualifier}:<30d")
+            cutoff = now - timedelta(**{AGE_UNITS[age.group(2)]: int(age.group(1))})
+            cutoff = cutoff.replace(minute=0, second=0, microsecond=0)
+            if age.group(2) != "h":
+                cutoff = cutoff.replace(hour=0)
+            # A younger age is a later timestamp
+            if operator == "<":
+                low = cutoff + ONE_SECOND
+            elif operator == "<=":
+                low = cutoff
+            elif operator == ">":
+                high = cutoff - ONE_SECOND
+            else:
+                high = cutoff
+            continue
+        first, last = _timestamp(qualifier, operand)
+        if operator in (">=", ">", "="):
+            low = last + ONE_SECOND if operator == ">" else first
+        if operator in ("<=", "<", "="):
+            high = first - ONE_SECOND if operator == "<" else last
+    return _range_condition(qualifier, f"issues.{qualifier}_at", low, high, _render_timestamp)
+
+
+QUALIFIERS: Dict[str, Callable[[str, str, datetime], Tuple[str, str, Tuple]]] = {
+    "label": _label,
+    "assignee": _assignee,
+    "milestone": _milestone,
+    "state": _state,
+    "repo": _repo,
+    "no": _no,
+    "comments": _number,
+    "reactions": _number,
+    "created": _date,
+    "updated": _date,
+}
+
+
+def parse_filter(expression: str, now: Optional[datetime] = None) -> IssueFilter:
+    """
+    Parse a filter expression such as `label:bug updated:<30d -assignee:octocat`.
+
+    Terms are whitespace-separated and all must match:
+    - `label:`, `assignee:`, `milestone:`, `state:`, `repo:` take one or more
+      comma-separated values (any of them matches), case-insensitively except repo
+    - `no:label`, `no:assignee`, `no:milestone`
+    - `comments:`, `reactions:` take `N`, `>N`, `>=N`, `<N`, `<=N` or `N..M`
+    - `created:`, `updated:` take the same with dates or timestamps, or ages like `<30d`
+    - any other word or "quoted phrase" must occur in the title
+    - a leading `-` negates a term
+
+    Args:
+        expression: Filter expression
+        now: Reference time for ages (defaults to the current minute)
+
+    Raises:
+        InvalidFilterError: If the expression cannot be parsed
+    """
+    if now is None:
+        now = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+    
+    conditions: Dict[str, FilterCondition] = {}
+    for match in TERM_PATTERN.finditer(expression):
+        negated, qualifier, quoted, bare = match.groups()
+        value = quoted if quoted is not None else bare
+        if '"' in value:
+            raise InvalidFilterError(f"Unbalanced quote in '{match.group(0)}'")
+        if qualifier is None:
+            if re.match(r'^[a-z]+:$', value):
+                raise InvalidFilterError(f"'{value}' needs a value")
+            compile_term = _text
+        elif qualifier in QUALIFIERS:
+            compile_term = QUALIFIERS[qualifier]
+        else:
+            raise InvalidFilterError(
+                f"Unknown filter qualifier '{qualifier}:'. Supported: {', '.join(QUALIFIERS)}"
+            )
+        if not value:
+            raise InvalidFilterError(f"Empty filter term in '{match.group(0)}'")
+        
+        try:
+            canonical, sql, params = compile_term(qualifier or "", value, now)
+        except OverflowError:
+            raise InvalidFilterError(f"Value out of range in '{match.group(0)}'")
+        if negated:
+            # Unknown values (e.g. no milestone) count as not matching
+            canonical, sql = f"-{canonical}", f"NOT COALESCE(({sql}), 0)"
+        conditions[canonical] = FilterCondition(canonical, sql, params)
+        if len(conditions) > MAX_TERMS:
+            raise InvalidFilterError(f"Filters accept at most {MAX_TERMS} terms")
+    
+    return IssueFilter(tuple(conditions[canonical] for canonical in sorted(conditions)))
@@ -1,29 +1,146 @@
 """Issue repository for database operations."""
 
+import json
 import sqlite3
-from typing import List, Optional
+import time
+import zlib
+from typing import Collection, Iterable, Iterator, List, Optional, Tuple, Union
 from pathlib import Path
 import logging
 
 from app.config import settings
+from app.repositories.connection import connect, utc_now
+from app.repositories.issue_filter import IssueFilter
 
 logger = logging.getLogger(__name__)
 
+ISSUE_COLUMNS = 'id, repo, title, body, html_url, created_at, updated_at, state, milestone, comments, reactions'
+
+# Issue metadata columns added after the first release, as (name, definition)
+ISSUE_METADATA_COLUMNS = [
+    ('updated_at', 'TEXT'),
+    ('state', "TEXT NOT NULL DEFAULT 'open'"),
+    ('milestone', 'TEXT COLLATE NOCASE'),
+    ('comments', 'INTEGER NOT NULL DEFAULT 0'),
+    ('reactions', 'INTEGER NOT NULL DEFAULT 0')
+]
+
+# Issue columns plus labels and assignees as JSON arrays, for listings and exports
+DETAIL_COLUMNS = '''
+    issues.id, issues.repo, issues.title, issues.body, issues.html_url, issues.created_at,
+    issues.updated_at, issues.state,
+    (SELECT json_group_array(label) FROM issue_labels WHERE issue_id = issues.id) AS labels,
+    (SELECT json_group_array(login) FROM issue_assignees WHERE issue_id = issues.id) AS assignees,
+    issues.milestone, issues.comments, issues.reactions
+'''
+
+
+def _compress_body(body: Optional[str]) -> Optional[Union[str, bytes]]:
+    """
+    Compress an issue body for storage.
+    Bodies are stored as zlib BLOBs when that saves space, otherwise as plain TEXT.
+    """
+    if not body:
+        return body
+    raw = body.encode("utf-8")
+    compressed = zlib.compress(raw, settings.BODY_COMPRESSION_LEVEL)
+    if len(compressed) < len(raw):
+        return compressed
+    return body
+
+
+def _decompress_body(value: Optional[Union[str, bytes]]) -> str:
+    """Restore an issue body stored by _compress_body (plain TEXT rows pass through)."""
+    if value is None:
+        return ""
+    if isinstance(value, bytes):
+        return zlib.decompress(value).decode("utf-8")
+    return value
+
+
+def _issue_row(repo: str, issue) -> tuple:
+    """Build an `issues` row (ISSUE_COLUMNS) from an Issue or an issue dict, compressing the body."""
+    if not isinstance(issue, dict):
+        issue = vars(issue)
+    return (
+        issue['id'],
+        repo,
+        issue['title'],
+        _compress_body(issue.get('body', '')),
+        issue['html_url'],
+        issue['created_at'],
+        issue.get('updated_at') or issue['created_at'],
+        issue.get('state') or 'open',
+        issue.get('milestone'),
+        issue.get('comments') or 0,
+        issue.get('reactions') or 0
+    )
+
+
+def _metadata_rows(issues: Iterable, field: str) -> List[Tuple[int, str]]:
+    """(issue id, value) rows of a list field (labels, assignees) of Issues or issue dicts."""
+    rows = []
+    for issue in issues:
+        if not isinstance(issue, dict):
+            issue = vars(issue)
+        rows.extend((issue['id'], value) for value in issue.get(field) or ())
+    return rows
+
+
+def _detail_row(row: sqlite3.Row) -> dict:
+    """Turn a DETAIL_COLUMNS row into an issue dict with its body and metadata restored."""
+    issue = dict(row)
+    issue["body"] = _decompress_body(issue["body"])
+    issue["labels"] = json.loads(issue["labels"])
+    issue["assignees"] = json.loads(issue["assignees"])
+    return issue
+
+
+def _where(repo: Optional[str], issue_filter: Optional[IssueFilter]) -> Tuple[str, list]:
+    """WHERE clause selecting the issues of a repo (or all repos) that match a filter."""
+    conditions = []
+    params: list = []
+    if repo:
+        conditions.append('issues.repo = ?')
+        params.append(repo)
+    if issue_filter is not None:
+        sql, filter_params = issue_filter.where()
+        if sql:
+            conditions.append(sql)
+            params.extend(filter_params)
+    if not conditions:
+        return '', params
+    return ' WHERE ' + ' AND '.join(conditions), params
+
 
 class IssueRepository:
     """Repository for managing issues in SQLite database."""
     
-    def __init__(self):
-        self.db_path = settings.DATABASE_PATH
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or settings.DATABASE_PATH
+    
+    def _connect(self, method: str, **kwargs) -> sqlite3.Connection:
+        """Open a connection to the cache database, timed under the calling method's name."""
+        return connect(self.db_path, method, **kwargs)
     
     def init_db(self) -> None:
         """Initialize the database and create tables if they don't exist."""
         # Ensure the directory exists
         Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
         
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect("init_db")
         cursor = conn.cursor()
         
+        # Incremental auto-vacuum lets eviction hand pages back to the OS.
+        # Switching modes on an existing file only takes effect after a VACUUM.
+        cursor.execute('PRAGMA auto_vacuum')
+        if cursor.fetchone()[0] != 2:
+            cursor.execute('PRAGMA auto_vacuum = INCREMENTAL')
+            cursor.execute('VACUUM')
+        
+        # WAL lets worker processes read while another one writes
+        cursor.execute('PRAGMA journal_mode = WAL')
+        
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS issues (
                 id INTEGER PRIMARY KEY,
@@ -31,71 +148,390 @@ class IssueRepository:
                 title TEXT NOT NULL,
                 body TEXT,
                 html_url TEXT NOT NULL,
-                created_at TEXT NOT NULL
+                created_at TEXT NOT NULL,
+                updated_at TEXT,
+                state TEXT NOT NULL DEFAULT 'open',
+                milestone TEXT COLLATE NOCASE,
+                comments INTEGER NOT NULL DEFAULT 0,
+                reactions INTEGER NOT NULL DEFAULT 0
             )
         ''')
         
+        # Caches created before issue metadata was stored; it fills in on the next scan
+        cursor.execute('PRAGMA table_info(issues)')
+        existing = [row[1] for row in cursor.fetchall()]
+        for column, definition in ISSUE_METADATA_COLUMNS:
+            if column not in existing:
+                cursor.execute(f'ALTER TABLE issues ADD COLUMN {column} {definition}')
+        if 'updated_at' not in existing:
+            cursor.execute('UPDATE issues SET updated_at = created_at')
+        
         # Create index on repo for faster queries
         cursor.execute('''
             CREATE INDEX IF NOT EXISTS idx_issues_repo ON issues(repo)
         ''')
         
+        # Newest-first reads and date filters within a repo
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_issues_repo_created ON issues(repo, created_at)
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_issues_repo_updated ON issues(repo, updated_at)
+        ''')
+        
+        # Labels and assignees, one row per issue and value; names compare case-insensitively
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS issue_labels (
+                issue_id INTEGER NOT NULL,
+                label TEXT NOT NULL COLLATE NOCASE,
+                PRIMARY KEY (issue_id, label)
+            ) WITHOUT ROWID
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_issue_labels_label ON issue_labels(label)
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS issue_assignees (
+                issue_id INTEGER NOT NULL,
+                login TEXT NOT NULL COLLATE NOCASE,
+                PRIMARY KEY (issue_id, login)
+            ) WITHOUT ROWID
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_issue_assignees_login ON issue_assignees(login)
+        ''')
+        
+        # Repo catalog: one row per cached repo with its size and access times
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS repos (
+                repo TEXT PRIMARY KEY,
+                issue_count INTEGER NOT NULL DEFAULT 0,
+                size_bytes INTEGER NOT NULL DEFAULT 0,
+                scanned_at TEXT,
+                last_accessed_at TEXT,
+                version INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        
+        # Catalogs created before content versions existed
+        cursor.execute('PRAGMA table_info(repos)')
+        if 'version' not in [row[1] for row in cursor.fetchall()]:
+            cursor.execute('ALTER TABLE repos ADD COLUMN version INTEGER NOT NULL DEFAULT 0')
+        
+        # Backfill the catalog for repos cached before it existed
+        cursor.execute('''
+            SELECT DISTINCT repo FROM issues
+            WHERE repo NOT IN (SELECT repo FROM repos)
+        ''')
+        for (repo,) in cursor.fetchall():
+            self._refresh_catalog(cursor, repo)
+        
         conn.commit()
         conn.close()
         logger.info(f"Database initialized at {self.db_path}")
     
+    def _refresh_catalog(self, cursor: sqlite3.Cursor, repo: str, scanned_at: Optional[str] = None) -> None:
+        """
+        Recompute the catalog row (issue count and stored size) for a repo.
+        Also sets a new content version, which keys shared analysis results. Versions are
+        write timestamps in nanoseconds, so they never repeat even after a repo is evicted.
+        """
+        cursor.execute('''
+            SELECT COUNT(*), COALESCE(SUM(
+                LENGTH(CAST(title AS BLOB)) + COALESCE(LENGTH(CAST(body AS BLOB)), 0)
+                + LENGTH(CAST(html_url AS BLOB)) + LENGTH(CAST(created_at AS BLOB))
+            ), 0)
+            FROM issues WHERE repo = ?
+        ''', (repo,))
+        issue_count, size_bytes = cursor.fetchone()
+        
+        cursor.execute('''
+            INSERT INTO repos (repo, issue_count, size_bytes, scanned_at, version)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(repo) DO UPDATE SET
+                issue_count = excluded.issue_count,
+                size_bytes = excluded.size_bytes,
+                scanned_at = COALESCE(excluded.scanned_at, repos.scanned_at),
+                version = excluded.version
+        ''', (repo, issue_count, size_bytes, scanned_at, time.time_ns()))
+    
+    def _delete_issues(self, cursor: sqlite3.Cursor, where: str, params: tuple = ()) -> int:
+        """Delete the issues matching `where` together with their labels and assignees."""
+        for table in ('issue_labels', 'issue_assignees'):
+            cursor.execute(
+                f'DELETE FROM {table} WHERE issue_id IN (SELECT id FROM main.issues WHERE {where})', params
+            )
+        cursor.execute(f'DELETE FROM main.issues WHERE {where}', params)
+        return cursor.rowcount
+    
+    def _save_metadata(
+        self,
+        cursor: sqlite3.Cursor,
+        issues: list,
+        labels_table: str = 'issue_labels',
+        assignees_table: str = 'issue_assignees'
+    ) -> None:
+        """Insert the labels and assignees of issues whose previous ones were already removed."""
+        cursor.executemany(
+            f'INSERT OR IGNORE INTO {labels_table} (issue_id, label) VALUES (?, ?)',
+            _metadata_rows(issues, 'labels')
+        )
+        cursor.executemany(
+            f'INSERT OR IGNORE INTO {assignees_table} (issue_id, login) VALUES (?, ?)',
+            _metadata_rows(issues, 'assignees')
+        )
+    
+    def _evict_to_limit(self, conn: sqlite3.Connection, keep: Collection[str]) -> List[str]:
+        """
+        Evict least recently used repos until the cache fits in CACHE_MAX_BYTES.
+        The repos that were just written are never evicted.
+        Returns the evicted repo names.
+        """
+        if settings.CACHE_MAX_BYTES <= 0:
+            return []
+        
+        cursor = conn.cursor()
+        cursor.execute('SELECT COALESCE(SUM(size_bytes), 0) FROM repos')
+        total = cursor.fetchone()[0]
+        if total <= settings.CACHE_MAX_BYTES:
+            return []
+        
+        # Repos never analyzed fall back to their scan time
+        cursor.execute('''
+            SELECT repo, size_bytes FROM repos
+            ORDER BY COALESCE(last_accessed_at, scanned_at, '') ASC
+        ''')
+        
+        evicted = []
+        for repo, size_bytes in cursor.fetchall():
+            if total <= settings.CACHE_MAX_BYTES:
+                break
+            if repo in keep:
+                continue
+            self._delete_issues(cursor, 'repo = ?', (repo,))
+            cursor.execute('DELETE FROM repos WHERE repo = ?', (repo,))
+            total -= size_bytes
+            evicted.append(repo)
+        conn.commit()
+        
+        if evicted:
+            # Reclaim the freed pages so the file actually shrinks; stepping the pragma
+            # through execute() frees one page per row fetched, executescript() runs it to completion
+            conn.executescript('PRAGMA incremental_vacuum')
+            logger.info(f"Evicted {len(evicted)} repos to stay under cache limit: {', '.join(evicted)}")
+        
+        return evicted
+    
     def save_issues(self, repo: str, issues: List[dict]) -> int:
         """
         Save issues to the database.
         Clears existing issues for the repo before inserting new ones.
         Returns the number of issues saved.
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect("save_issues")
         cursor = conn.cursor()
         
         # Delete existing issues for this repo
-        cursor.execute('DELETE FROM issues WHERE repo = ?', (repo,))
+        self._delete_issues(cursor, 'repo = ?', (repo,))
         
-        # Insert new issues
-        for issue in issues:
-            cursor.execute('''
-                INSERT INTO issues (id, repo, title, body, html_url, created_at)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (
-                issue.id if hasattr(issue, 'id') else issue['id'],
-                repo,
-                issue.title if hasattr(issue, 'title') else issue['title'],
-                issue.body if hasattr(issue, 'body') else issue.get('body', ''),
-                issue.html_url if hasattr(issue, 'html_url') else issue['html_url'],
-                issue.created_at if hasattr(issue, 'created_at') else issue['created_at']
-            ))
+        # Insert new issues and their labels and assignees in executemany passes
+        cursor.executemany(f'''
+            INSERT INTO issues ({ISSUE_COLUMNS})
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', [_issue_row(repo, issue) for issue in issues])
+        self._save_metadata(cursor, issues)
         
+        self._refresh_catalog(cursor, repo, scanned_at=utc_now())
         conn.commit()
+        
+        self._evict_to_limit(conn, keep=(repo,))
         conn.close()
         
         return len(issues)
     
-    def get_issues_by_repo(self, repo: str) -> List[dict]:
-        """Retrieve all issues for a given repository."""
-        conn = sqlite3.connect(self.db_path)
+    def apply_issue_changes(
+        self,
+        upserts: List[Tuple[str, dict]],
+        deletes: List[Tuple[str, int]]
+    ) -> List[str]:
+        """
+        Apply single-issue changes (e.g. from webhooks) in one transaction.
+        Changes for repos that were never scanned are skipped, so a partial
+        cache is never mistaken for a scanned repo. Upserts older than the
+        cached issue (by updated_at) are skipped, so late deliveries never
+        overwrite newer contents.
+        Returns the repos whose cached issues changed.
+        """
+        conn = self._connect("apply_issue_changes")
+        cursor = conn.cursor()
+        
+        cursor.execute('SELECT repo FROM repos')
+        cached_repos = {row[0] for row in cursor.fetchall()}
+        touched = set()
+        
+        for repo, issue in upserts:
+            if repo not in cached_repos:
+                continue
+            cursor.execute('SELECT repo FROM issues WHERE id = ?', (issue['id'],))
+            previous = cursor.fetchone()
+            cursor.execute(f'''
+                INSERT INTO issues ({ISSUE_COLUMNS})
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(id) DO UPDATE SET
+                    repo = excluded.repo,
+                    title = excluded.title,
+                    body = excluded.body,
+                    html_url = excluded.html_url,
+                    created_at = excluded.created_at,
+                    updated_at = excluded.updated_at,
+                    state = excluded.state,
+                    milestone = excluded.milestone,
+                    comments = excluded.comments,
+                    reactions = excluded.reactions
+                WHERE excluded.updated_at >= issues.updated_at
+            ''', _issue_row(repo, issue))
+            if cursor.rowcount == 0:
+                continue
+            # A transferred issue also leaves the repo it was cached under
+            if previous is not None and previous[0] != repo:
+                touched.add(previous[0])
+            # e.g. `labeled` and `assigned` events replace the whole set
+            cursor.execute('DELETE FROM issue_labels WHERE issue_id = ?', (issue['id'],))
+            cursor.execute('DELETE FROM issue_assignees WHERE issue_id = ?', (issue['id'],))
+            self._save_metadata(cursor, [issue])
+            touched.add(repo)
+        
+        for repo, issue_id in deletes:
+            if repo not in cached_repos:
+                continue
+            if self._delete_issues(cursor, 'id = ? AND repo = ?', (issue_id, repo)):
+                touched.add(repo)
+        
+        for repo in touched:
+            self._refresh_catalog(cursor, repo)
+        
+        conn.commit()
+        conn.close()
+        
+        return sorted(touched)
+    
+    def get_issues_by_repo(
+        self,
+        repo: str,
+        issue_filter: Optional[IssueFilter] = None,
+        limit: Optional[int] = None
+    ) -> List[dict]:
+        """
+        Retrieve the issues of a repository, newest first.
+        The filter and limit are applied in SQLite, so skipped issues are never loaded.
+        """
+        conn = self._connect("get_issues_by_repo")
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
-        cursor.execute('''
-            SELECT id, repo, title, body, html_url, created_at
-            FROM issues
-            WHERE repo = ?
-            ORDER BY created_at DESC
-        ''', (repo,))
+        where, params = _where(repo, issue_filter)
+        query = f'''
+            SELECT issues.id, issues.repo, issues.title, issues.body, issues.html_url, issues.created_at
+            FROM issues{where}
+            ORDER BY issues.created_at DESC
+        '''
+        if limit is not None:
+            query += ' LIMIT ?'
+            params.append(limit)
+        cursor.execute(query, params)
         
         rows = cursor.fetchall()
         conn.close()
         
-        return [dict(row) for row in rows]
+        issues = []
+        for row in rows:
+            issue = dict(row)
+            issue["body"] = _decompress_body(issue["body"])
+            issues.append(issue)
+        return issues
+    
+    def search_issues(
+        self,
+        repo: Optional[str] = None,
+        issue_filter: Optional[IssueFilter] = None,
+        limit: int = 30,
+        offset: int = 0
+    ) -> List[dict]:
+        """Retrieve a page of matching issues of one repo (or all repos) with their metadata, newest first."""
+        conn = self._connect("search_issues")
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        where, params = _where(repo, issue_filter)
+        cursor.execute(f'''
+            SELECT {DETAIL_COLUMNS}
+            FROM issues{where}
+            ORDER BY issues.created_at DESC, issues.id DESC
+            LIMIT ? OFFSET ?
+        ''', [*params, limit, offset])
+        
+        rows = cursor.fetchall()
+        conn.close()
+        
+        return [_detail_row(row) for row in rows]
+    
+    def iter_issues(self, repo: Optional[str] = None, batch_size: int = 1000) -> Iterator[dict]:
+        """
+        Stream cached issues of one repo (or all repos) with their metadata in constant memory.
+        Rows are fetched in batches from a single statement, which reads one
+        consistent snapshot even while other workers write. The generator may
+        be advanced from different threads, one at a time. Close it when stopping
+        early: the open read transaction holds back WAL checkpoints until then.
+        """
+        # (repo, id) is the order of idx_issues_repo, so no sort is needed
+        where, params = _where(repo, None)
+        query = f'SELECT {DETAIL_COLUMNS} FROM issues{where} ORDER BY issues.repo, issues.id'
+        
+        conn = self._connect("iter_issues", check_same_thread=False)
+        try:
+            conn.row_factory = sqlite3.Row
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield _detail_row(row)
+        finally:
+            conn.close()
+    
+    def begin_import(self) -> "SnapshotImport":
+        """Start a bulk import; see SnapshotImport."""
+        return SnapshotImport(self)
+    
+    def mark_accessed(self, repo: str) -> None:
+        """Record that a repository was just used, for LRU eviction."""
+        conn = self._connect("mark_accessed")
+        cursor = conn.cursor()
+        
+        cursor.execute(
+            'UPDATE repos SET last_accessed_at = ? WHERE repo = ?',
+            (utc_now(), repo)
+        )
+        
+        conn.commit()
+        conn.close()
+    
+    def get_repo_version(self, repo: str) -> int:
+        """Get the content version of a cached repository (0 if not cataloged)."""
+        conn = self._connect("get_repo_version")
+        cursor = conn.cursor()
+        
+        cursor.execute('SELECT version FROM repos WHERE repo = ?', (repo,))
+        row = cursor.fetchone()
+        conn.close()
+        
+        return row[0] if row else 0
     
     def has_repo(self, repo: str) -> bool:
         """Check if a repository has been scanned (exists in database)."""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect("has_repo")
         cursor = conn.cursor()
         
         cursor.execute('SELECT COUNT(*) FROM issues WHERE repo = ?', (repo,))
@@ -104,17 +540,129 @@ class IssueRepository:
         
         return count > 0
     
-    def get_issue_count(self, repo: str) -> int:
-        """Get the number of cached issues for a repository."""
-        conn = sqlite3.connect(self.db_path)
+    def get_issue_count(self, repo: Optional[str], issue_filter: Optional[IssueFilter] = None) -> int:
+        """Get the number of cached issues of a repository (or all repos) that match a filter."""
+        conn = self._connect("get_issue_count")
         cursor = conn.cursor()
         
-        cursor.execute('SELECT COUNT(*) FROM issues WHERE repo = ?', (repo,))
+        where, params = _where(repo, issue_filter)
+        cursor.execute(f'SELECT COUNT(*) FROM issues{where}', params)
         count = cursor.fetchone()[0]
         conn.close()
         
         return count
 
 
+class SnapshotImport:
+    """
+    Bulk load of issues that replaces whole repos atomically.
+
+    Batches are inserted with executemany into TEMP staging tables private to
+    this import's connection. commit() then swaps every staged repo into the
+    cache in one write transaction, so readers see either the old or the new
+    snapshot of a repo. Closing without commit() discards the staged rows.
+    """
+    
+    def __init__(self, repository: IssueRepository):
+        self.repository = repository
+        # Batches are written from worker threads, one at a time
+        self.conn = repository._connect("import_snapshot", check_same_thread=False)
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            CREATE TEMP TABLE issues_staging (
+                id INTEGER PRIMARY KEY,
+                repo TEXT NOT NULL,
+                title TEXT NOT NULL,
+                body TEXT,
+                html_url TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                updated_at TEXT,
+                state TEXT NOT NULL,
+                milestone TEXT,
+                comments INTEGER NOT NULL,
+                reactions INTEGER NOT NULL
+            )
+        ''')
+        cursor.execute('''
+            CREATE TEMP TABLE labels_staging (
+                issue_id INTEGER NOT NULL,
+                label TEXT NOT NULL COLLATE NOCASE,
+                PRIMARY KEY (issue_id, label)
+            ) WITHOUT ROWID
+        ''')
+        cursor.execute('''
+            CREATE TEMP TABLE assignees_staging (
+                issue_id INTEGER NOT NULL,
+                login TEXT NOT NULL COLLATE NOCASE,
+                PRIMARY KEY (issue_id, login)
+            ) WITHOUT ROWID
+        ''')
+    
+    def add(self, issues: List[dict]) -> None:
+        """Stage a batch of issue dicts (each with its `repo`); a repeated id replaces the earlier row."""
+        cursor = self.conn.cursor()
+        cursor.executemany(f'''
+            INSERT OR REPLACE INTO issues_staging ({ISSUE_COLUMNS})
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', [_issue_row(issue['repo'], issue) for issue in issues])
+        ids = [(issue['id'],) for issue in issues]
+        cursor.executemany('DELETE FROM labels_staging WHERE issue_id = ?', ids)
+        cursor.executemany('DELETE FROM assignees_staging WHERE issue_id = ?', ids)
+        self.repository._save_metadata(cursor, issues, 'labels_staging', 'assignees_staging')
+        self.conn.commit()
+    
+    def commit(self) -> List[Tuple[str, int]]:
+        """
+        Replace every staged repo in the cache with its staged issues.
+        Returns (repo, issue count) for each imported repo.
+        """
+        cursor = self.conn.cursor()
+        cursor.execute('SELECT repo, COUNT(*) FROM issues_staging GROUP BY repo ORDER BY repo')
+        imported = cursor.fetchall()
+        repos = [repo for repo, _ in imported]
+        if not repos:
+            return []
+        
+        try:
+            # Issues moved between repos keep their id; their old repo shrinks too
+            cursor.execute('''
+                SELECT DISTINCT repo FROM main.issues
+                WHERE id IN (SELECT id FROM issues_staging)
+                AND repo NOT IN (SELECT repo FROM issues_staging)
+            ''')
+            shrunk = [row[0] for row in cursor.fetchall()]
+            
+            self.repository._delete_issues(cursor, 'repo IN (SELECT repo FROM issues_staging)')
+            self.repository._delete_issues(cursor, 'id IN (SELECT id FROM issues_staging)')
+            cursor.execute(f'''
+                INSERT INTO main.issues ({ISSUE_COLUMNS})
+                SELECT {ISSUE_COLUMNS} FROM issues_staging
+            ''')
+            cursor.execute('INSERT INTO main.issue_labels SELECT issue_id, label FROM labels_staging')
+            cursor.execute('INSERT INTO main.issue_assignees SELECT issue_id, login FROM assignees_staging')
+            
+            scanned_at = utc_now()
+            for repo in repos:
+                self.repository._refresh_catalog(cursor, repo, scanned_at=scanned_at)
+            for repo in shrunk:
+                self.repository._refresh_catalog(cursor, repo)
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        
+        self.repository._evict_to_limit(self.conn, keep=repos)
+        for table in ('issues_staging', 'labels_staging', 'assignees_staging'):
+            cursor.execute(f'DELETE FROM {table}')
+        self.conn.commit()
+        logger.info(f"Imported {sum(count for _, count in imported)} issues for {len(repos)} repos")
+        
+        return imported
+    
+    def close(self) -> None:
+        """Close the import connection, dropping anything still staged."""
+        self.conn.close()
+
+
 # Singleton instance
 issue_repository = IssueRepository()
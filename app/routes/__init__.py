@@ -1,11 +1,15 @@
 """Routes package - HTTP route handlers."""
 
 from fastapi import APIRouter
-from app.routes import health, issues
+from app.routes import health, issues, jobs, search, webhooks, snapshots
 
 # Main router that includes all sub-routers
 router = APIRouter()
 router.include_router(health.router)
 router.include_router(issues.router)
+router.include_router(jobs.router)
+router.include_router(search.router)
+router.include_router(webhooks.router)
+router.include_router(snapshots.router)
 
 __all__ = ["router"]
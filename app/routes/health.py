@@ -1,6 +1,8 @@
 """Health check routes."""
 
-from fastapi import APIRouter
+import os
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, generate_latest, multiprocess
 
 router = APIRouter(tags=["Health"])
 
@@ -19,3 +21,14 @@ async def health_check():
         "service": "GitHub Issue Analyzer",
         "version": "1.0.0"
     }
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics for GitHub, SQLite, LLM and HTTP hot paths."""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        # Several workers: aggregate the per-process metric files
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return Response(content=generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -6,10 +6,19 @@ from fastapi import APIRouter, HTTPException
 from app.schemas import (
     ScanRequest, ScanResponse,
     AnalyzeRequest, AnalyzeResponse,
+    AnalyzeBatchRequest, AnalyzeBatchResponse, PromptAnalysis,
     ErrorResponse
 )
 from app.services import scan_service, analyze_service
-from app.exceptions import GitHubClientError, LLMError, RepositoryNotFoundError, NoIssuesFoundError
+from app.exceptions import (
+    GitHubClientError,
+    LLMError,
+    AnalysisBudgetExceededError,
+    InvalidFilterError,
+    RepositoryNotFoundError,
+    NoIssuesFoundError,
+    ScanInProgressError
+)
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +27,7 @@ router = APIRouter(tags=["Issues"])
 
 @router.post("/scan", response_model=ScanResponse, responses={
     400: {"model": ErrorResponse},
+    409: {"model": ErrorResponse},
     429: {"model": ErrorResponse},
     502: {"model": ErrorResponse}
 })
@@ -40,12 +50,17 @@ async def scan_repository(request: ScanRequest):
     except GitHubClientError as e:
         logger.error(f"GitHub API error: {e.message}")
         raise HTTPException(status_code=e.status_code, detail=e.message)
+    
+    except ScanInProgressError as e:
+        logger.warning(f"Scan already in progress: {e.message}")
+        raise HTTPException(status_code=e.status_code, detail=e.message)
 
 
 @router.post("/analyze", response_model=AnalyzeResponse, responses={
     400: {"model": ErrorResponse},
     404: {"model": ErrorResponse},
-    500: {"model": ErrorResponse}
+    500: {"model": ErrorResponse},
+    504: {"model": ErrorResponse}
 })
 async def analyze_issues(request: AnalyzeRequest):
     """
@@ -55,15 +70,84 @@ async def analyze_issues(request: AnalyzeRequest):
     - Combines user prompt with issue data
     - Sends to LLM for analysis
     - Returns natural-language analysis
+    - With `filter` (e.g. `label:bug updated:<30d`), only matching issues are loaded and analyzed
+    - With `latency_budget_ms` and/or `token_budget`, plans the analysis to fit and
+      returns a partial analysis (`partial: true`) rather than overrunning the deadline
     """
     try:
+        if request.latency_budget_ms is not None or request.token_budget is not None:
+            result = await analyze_service.analyze_within_budget(
+                repo=request.repo,
+                prompt=request.prompt,
+                mode=request.mode.value,
+                latency_budget=request.latency_budget_ms / 1000 if request.latency_budget_ms else None,
+                token_budget=request.token_budget,
+                filter_expression=request.filter
+            )
+            return AnalyzeResponse(
+                analysis=result.analysis,
+                partial=result.partial,
+                issues_analyzed=result.issues_analyzed
+            )
+        
         analysis = await analyze_service.analyze_issues(
             repo=request.repo,
             prompt=request.prompt,
-            mode=request.mode.value
+            mode=request.mode.value,
+            filter_expression=request.filter
         )
         return AnalyzeResponse(analysis=analysis)
     
+    except InvalidFilterError as e:
+        logger.warning(f"Invalid filter: {e.message}")
+        raise HTTPException(status_code=e.status_code, detail=e.message)
+    
+    except AnalysisBudgetExceededError as e:
+        logger.error(f"Analysis budget exceeded: {e.message}")
+        raise HTTPException(status_code=e.status_code, detail=e.message)
+    
+    except RepositoryNotFoundError as e:
+        logger.error(f"Repository not found: {e.message}")
+        raise HTTPException(status_code=e.status_code, detail=e.message)
+    
+    except NoIssuesFoundError as e:
+        logger.error(f"No issues found: {e.message}")
+        raise HTTPException(status_code=e.status_code, detail=e.message)
+    
+    except LLMError as e:
+        logger.error(f"LLM error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/analyze/batch", response_model=AnalyzeBatchResponse, responses={
+    400: {"model": ErrorResponse},
+    404: {"model": ErrorResponse},
+    500: {"model": ErrorResponse}
+})
+async def analyze_batch(request: AnalyzeBatchRequest):
+    """
+    Answer many prompts about one repository in a single pass.
+    
+    - Maps the issues once into prompt-independent facts (themes, bug categories, severity, components)
+    - Runs only one final LLM call per prompt on top of those facts
+    - Returns one analysis per distinct prompt, in request order
+    """
+    try:
+        results = await analyze_service.analyze_batch(
+            repo=request.repo,
+            prompts=request.prompts,
+            mode=request.mode.value,
+            filter_expression=request.filter
+        )
+        return AnalyzeBatchResponse(
+            repo=request.repo,
+            results=[PromptAnalysis(prompt=prompt, analysis=analysis) for prompt, analysis in results.items()]
+        )
+    
+    except InvalidFilterError as e:
+        logger.warning(f"Invalid filter: {e.message}")
+        raise HTTPException(status_code=e.status_code, detail=e.message)
+    
     except RepositoryNotFoundError as e:
         logger.error(f"Repository not found: {e.message}")
         raise HTTPException(status_code=e.status_code, detail=e.message)
@@ -0,0 +1,84 @@
+"""Job routes - cross-worker view of scan and analysis jobs, and background analysis jobs."""
+
+import asyncio
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Query
+
+from app.schemas import JobResponse, AnalysisJobResponse, AnalyzeRequest, ErrorResponse
+from app.repositories import coordination_repository
+from app.services import analyze_service
+from app.exceptions import RepositoryNotFoundError, InvalidFilterError, JobNotFoundError, JobNotResumableError
+
+router = APIRouter(tags=["Jobs"])
+
+
+@router.get("/jobs", response_model=List[JobResponse])
+async def list_jobs(
+    repo: Optional[str] = Query(None, description="Only jobs for this 'owner/repo'"),
+    status: Optional[str] = Query(None, description="'running', 'succeeded' or 'failed'"),
+    limit: int = Query(50, ge=1, le=500)
+):
+    """List recent scan and analysis jobs from all workers, newest first."""
+    jobs = await asyncio.to_thread(coordination_repository.list_jobs, repo, status, limit)
+    return [JobResponse(**job) for job in jobs]
+
+
+@router.get("/jobs/{job_id}", response_model=JobResponse, responses={
+    404: {"model": ErrorResponse}
+})
+async def get_job(job_id: str):
+    """Get a single job by id."""
+    job = await asyncio.to_thread(coordination_repository.get_job, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    return JobResponse(**job)
+
+
+@router.post("/analyze/jobs", response_model=AnalysisJobResponse, status_code=202, responses={
+    400: {"model": ErrorResponse},
+    404: {"model": ErrorResponse}
+})
+async def start_analysis_job(request: AnalyzeRequest):
+    """
+    Start an analysis in the background and return its job immediately.
+    
+    - Every map and reduce output is checkpointed under the job id
+    - Relative dates in `filter` are resolved once, so a resumed job analyzes the same issues
+    - Poll `GET /analyze/jobs/{job_id}` for progress and the result
+    """
+    try:
+        run = await analyze_service.start_analysis_job(
+            request.repo, request.prompt, request.mode.value, request.filter
+        )
+        return AnalysisJobResponse(**run)
+    except (InvalidFilterError, RepositoryNotFoundError) as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
+
+
+@router.get("/analyze/jobs/{job_id}", response_model=AnalysisJobResponse, responses={
+    404: {"model": ErrorResponse}
+})
+async def get_analysis_job(job_id: str):
+    """Get an analysis job: status, completed checkpoints, and the result once it succeeded."""
+    try:
+        run = await analyze_service.get_analysis_job(job_id)
+        return AnalysisJobResponse(**run)
+    except JobNotFoundError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
+
+
+@router.post("/analyze/jobs/{job_id}/resume", response_model=AnalysisJobResponse, status_code=202, responses={
+    404: {"model": ErrorResponse},
+    409: {"model": ErrorResponse}
+})
+async def resume_analysis_job(job_id: str):
+    """
+    Resume a failed or stalled analysis job, redoing only the steps without a checkpoint.
+    
+    A running job can be taken over once it has made no progress for `ANALYSIS_RUN_STALE_SECONDS`.
+    """
+    try:
+        run = await analyze_service.resume_analysis_job(job_id)
+        return AnalysisJobResponse(**run)
+    except (JobNotFoundError, JobNotResumableError) as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
@@ -0,0 +1,69 @@
+"""Search routes - filtered issue listing and search over the cache."""
+
+import logging
+from fastapi import APIRouter, HTTPException, Query
+
+from app.schemas import IssueListResponse, IssueResponse, ErrorResponse
+from app.services import search_service
+from app.services.search_service import IssuePage
+from app.exceptions import InvalidFilterError, RepositoryNotFoundError
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["Search"])
+
+FILTER_DESCRIPTION = "Filter expression, e.g. 'label:bug updated:<30d comments:>5'"
+
+
+def _page_response(page: IssuePage) -> IssueListResponse:
+    return IssueListResponse(
+        total=page.total,
+        filter=page.filter,
+        issues=[IssueResponse(**issue) for issue in page.issues]
+    )
+
+
+@router.get("/repos/{owner}/{name}/issues", response_model=IssueListResponse, responses={
+    400: {"model": ErrorResponse},
+    404: {"model": ErrorResponse}
+})
+async def list_issues(
+    owner: str,
+    name: str,
+    filter: str = Query("", max_length=500, description=FILTER_DESCRIPTION),
+    limit: int = Query(30, ge=1, le=100),
+    offset: int = Query(0, ge=0)
+):
+    """
+    List the cached issues of a repository, newest first.
+    
+    - The filter is evaluated in SQLite; only the requested page is loaded
+    - `total` counts every matching issue; `filter` is the normalized expression
+    """
+    try:
+        page = await search_service.list_issues(f"{owner}/{name}", filter, limit, offset)
+        return _page_response(page)
+    except (InvalidFilterError, RepositoryNotFoundError) as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
+
+
+@router.get("/search", response_model=IssueListResponse, responses={
+    400: {"model": ErrorResponse}
+})
+async def search_issues(
+    q: str = Query("", max_length=500, description=FILTER_DESCRIPTION + "; narrow to repos with repo:owner/name"),
+    limit: int = Query(30, ge=1, le=100),
+    offset: int = Query(0, ge=0)
+):
+    """
+    Search the cached issues of every repository, newest first.
+    
+    - Qualifiers (`label:`, `assignee:`, `milestone:`, `state:`, `repo:`, `no:`, `comments:`,
+      `reactions:`, `created:`, `updated:`) and free text matched against titles
+    - `-` negates a term, e.g. `-label:wontfix`
+    """
+    try:
+        page = await search_service.search(q, limit, offset)
+        return _page_response(page)
+    except InvalidFilterError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
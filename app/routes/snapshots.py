@@ -0,0 +1,111 @@
+"""Snapshot routes - NDJSON export and bulk import of the issue cache."""
+
+import asyncio
+import logging
+import threading
+from typing import AsyncIterator, Iterator, Optional
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+
+from app.schemas import SnapshotCompression, ImportResponse, ErrorResponse
+from app.services import snapshot_service
+from app.repositories import issue_repository
+from app.exceptions import RepositoryNotFoundError, SnapshotFormatError
+from app.security import is_admin
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["Snapshots"])
+
+
+async def _close_on_disconnect(chunks: Iterator[bytes]) -> AsyncIterator[bytes]:
+    """
+    Advance a blocking generator in the threadpool, and close it when the stream ends or
+    is cancelled (e.g. the client disconnected), so its SQLite read does not stay open.
+    """
+    # next() and close() must not overlap; a cancelled next() may still be running
+    lock = threading.Lock()
+    
+    def advance() -> Optional[bytes]:
+        with lock:
+            return next(chunks, None)
+    
+    def close() -> None:
+        with lock:
+            chunks.close()
+    
+    loop = asyncio.get_running_loop()
+    try:
+        while True:
+            chunk = await loop.run_in_executor(None, advance)
+            if chunk is None:
+                break
+            yield chunk
+    finally:
+        # Not awaited: after a cancellation the close must still happen
+        loop.run_in_executor(None, close)
+
+
+def _export_response(repo: Optional[str], compression: SnapshotCompression) -> StreamingResponse:
+    """Stream a snapshot as NDJSON, or as a gzip file download."""
+    gzip = compression == SnapshotCompression.gzip
+    name = repo.replace("/", "__") if repo else "issues"
+    filename = f"{name}.ndjson.gz" if gzip else f"{name}.ndjson"
+    return StreamingResponse(
+        _close_on_disconnect(snapshot_service.export_ndjson(repo, gzip=gzip)),
+        media_type="application/gzip" if gzip else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+@router.get("/snapshots/export", response_class=StreamingResponse)
+async def export_all(
+    compression: SnapshotCompression = Query(SnapshotCompression.none, description="'none' or 'gzip'")
+):
+    """
+    Export every cached issue as NDJSON (one issue object per line), grouped by repo.
+    
+    - Streams straight from a SQLite cursor in constant memory
+    - Reads one consistent snapshot even while scans and webhooks write
+    """
+    return _export_response(None, compression)
+
+
+@router.get("/snapshots/export/{owner}/{name}", response_class=StreamingResponse, responses={
+    404: {"model": ErrorResponse}
+})
+async def export_repo(
+    owner: str,
+    name: str,
+    compression: SnapshotCompression = Query(SnapshotCompression.none, description="'none' or 'gzip'")
+):
+    """Export the cached issues of one repository as NDJSON."""
+    repo = f"{owner}/{name}"
+    if not await asyncio.to_thread(issue_repository.has_repo, repo):
+        error = RepositoryNotFoundError(repo)
+        raise HTTPException(status_code=error.status_code, detail=error.message)
+    return _export_response(repo, compression)
+
+
+@router.post("/snapshots/import", response_model=ImportResponse, responses={
+    400: {"model": ErrorResponse},
+    403: {"model": ErrorResponse}
+})
+async def import_snapshot(request: Request):
+    """
+    Load an NDJSON snapshot (plain or gzip) produced by the export endpoints.
+    
+    - Requires a valid `X-Admin-Token`
+    - Each repo in the snapshot replaces its cached issues atomically; other repos are untouched
+    - A malformed line rejects the whole import
+    """
+    if not is_admin(request):
+        raise HTTPException(status_code=403, detail="Importing snapshots requires a valid admin token")
+    
+    try:
+        result = await snapshot_service.import_ndjson(request.stream())
+    except SnapshotFormatError as e:
+        logger.warning(f"Rejected snapshot import: {e.message}")
+        raise HTTPException(status_code=e.status_code, detail=e.message)
+    
+    return ImportResponse(repos=result.repos, issues_imported=result.issues_imported)
@@ -0,0 +1,66 @@
+"""Webhook routes - GitHub event ingestion."""
+
+import json
+import logging
+from typing import Optional
+from fastapi import APIRouter, Header, HTTPException, Request
+
+from app.schemas import WebhookResponse, ErrorResponse
+from app.services import webhook_service
+from app.services.webhook_service import verify_signature
+from app.exceptions import WebhookSignatureError
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["Webhooks"])
+
+
+@router.post("/webhooks/github", response_model=WebhookResponse, responses={
+    400: {"model": ErrorResponse},
+    401: {"model": ErrorResponse}
+})
+async def github_webhook(
+    request: Request,
+    x_github_event: str = Header(""),
+    x_hub_signature_256: Optional[str] = Header(None)
+):
+    """
+    Receive GitHub webhook deliveries and keep the cache current without polling.
+    
+    - Verifies the `X-Hub-Signature-256` HMAC with `GITHUB_WEBHOOK_SECRET`
+    - Applies `issues` events (opened, edited, reopened, closed, deleted, ...) to already scanned repos
+    - Batches bursts of events into one write transaction
+    - Other events are acknowledged and ignored
+    """
+    body = await request.body()
+    try:
+        verify_signature(body, x_hub_signature_256)
+    except WebhookSignatureError as e:
+        logger.warning(f"Rejected webhook delivery: {e.message}")
+        raise HTTPException(status_code=e.status_code, detail=e.message)
+    
+    if x_github_event == "ping":
+        return WebhookResponse(event="ping", status="pong")
+    if x_github_event != "issues":
+        return WebhookResponse(event=x_github_event, status="ignored")
+    
+    try:
+        payload = json.loads(body)
+        issue = payload["issue"]
+        if not (payload["repository"]["full_name"] and payload["action"] and issue["id"]):
+            raise ValueError("Missing repository, action or issue")
+        # Everything parse_issue needs to cache the issue
+        if not (issue["title"] is not None and issue["html_url"] and issue["created_at"]):
+            raise ValueError("Missing issue title, html_url or created_at")
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Malformed issues event payload")
+    
+    try:
+        applied = await webhook_service.handle_issue_event(payload)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return WebhookResponse(
+        event="issues",
+        action=payload["action"],
+        status="applied" if applied else "ignored"
+    )
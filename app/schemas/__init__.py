@@ -1,9 +1,23 @@
 """Schemas package - Request and Response models."""
 
-from app.schemas.requests import ScanRequest, AnalyzeRequest, AnalysisMode
+from app.schemas.requests import (
+    ScanRequest,
+    AnalyzeRequest,
+    AnalyzeBatchRequest,
+    AnalysisMode,
+    SnapshotCompression
+)
 from app.schemas.responses import (
     ScanResponse, 
     AnalyzeResponse, 
+    IssueResponse,
+    IssueListResponse,
+    PromptAnalysis,
+    AnalyzeBatchResponse,
+    JobResponse,
+    AnalysisJobResponse,
+    WebhookResponse,
+    ImportResponse,
     HealthResponse, 
     ErrorResponse
 )
@@ -11,9 +25,19 @@ from app.schemas.responses import (
 __all__ = [
     "ScanRequest",
     "AnalyzeRequest", 
+    "AnalyzeBatchRequest",
     "AnalysisMode",
+    "SnapshotCompression",
     "ScanResponse",
     "AnalyzeResponse",
+    "IssueResponse",
+    "IssueListResponse",
+    "PromptAnalysis",
+    "AnalyzeBatchResponse",
+    "JobResponse",
+    "AnalysisJobResponse",
+    "WebhookResponse",
+    "ImportResponse",
     "HealthResponse",
     "ErrorResponse"
 ]
@@ -2,6 +2,7 @@
 
 from pydantic import BaseModel, Field, field_validator
 from enum import Enum
+from typing import List, Optional
 import re
 
 
@@ -25,6 +26,12 @@ class AnalysisMode(str, Enum):
     default = "default"  # Analyze all cached issues (comprehensive)
 
 
+class SnapshotCompression(str, Enum):
+    """Compression of an exported snapshot."""
+    none = "none"
+    gzip = "gzip"
+
+
 class AnalyzeRequest(BaseModel):
     """Request body for POST /analyze endpoint."""
     repo: str = Field(..., description="GitHub repository in format 'owner/repo'")
@@ -33,6 +40,21 @@ class AnalyzeRequest(BaseModel):
         default=AnalysisMode.fast, 
         description="'fast' (50 issues) or 'default' (all issues)"
     )
+    latency_budget_ms: Optional[int] = Field(
+        default=None,
+        ge=1000,
+        description="Return within this many milliseconds; a partial analysis is returned if needed"
+    )
+    token_budget: Optional[int] = Field(
+        default=None,
+        ge=1000,
+        description="Upper bound on LLM tokens (input and output) the analysis may use"
+    )
+    filter: Optional[str] = Field(
+        default=None,
+        max_length=500,
+        description="Only analyze issues matching this filter expression, e.g. 'label:bug updated:<30d'"
+    )
     
     @field_validator("repo")
     @classmethod
@@ -42,3 +64,35 @@ class AnalyzeRequest(BaseModel):
         if not re.match(pattern, v):
             raise ValueError("Invalid repository format. Expected 'owner/repo'")
         return v
+
+
+class AnalyzeBatchRequest(BaseModel):
+    """Request body for POST /analyze/batch endpoint."""
+    repo: str = Field(..., description="GitHub repository in format 'owner/repo'")
+    prompts: List[str] = Field(..., min_length=1, max_length=50, description="Analysis prompts for the LLM")
+    mode: AnalysisMode = Field(
+        default=AnalysisMode.fast, 
+        description="'fast' (50 issues) or 'default' (all issues)"
+    )
+    filter: Optional[str] = Field(
+        default=None,
+        max_length=500,
+        description="Only analyze issues matching this filter expression, e.g. 'label:bug updated:<30d'"
+    )
+    
+    @field_validator("repo")
+    @classmethod
+    def validate_repo_format(cls, v: str) -> str:
+        """Validate repository format as owner/repo."""
+        pattern = r'^[a-zA-Z0-9_.-]+/[a-zA-Z0-9_.-]+$'
+        if not re.match(pattern, v):
+            raise ValueError("Invalid repository format. Expected 'owner/repo'")
+        return v
+    
+    @field_validator("prompts")
+    @classmethod
+    def validate_prompts(cls, v: List[str]) -> List[str]:
+        """Reject empty prompts."""
+        if any(not prompt.strip() for prompt in v):
+            raise ValueError("Prompts must not be empty")
+        return v
@@ -1,7 +1,7 @@
 """Response schemas for API endpoints."""
 
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 
 
 class ScanResponse(BaseModel):
@@ -14,6 +14,78 @@ class ScanResponse(BaseModel):
 class AnalyzeResponse(BaseModel):
     """Response body for POST /analyze endpoint."""
     analysis: str
+    partial: bool = False
+    issues_analyzed: Optional[int] = None
+
+
+class IssueResponse(BaseModel):
+    """A cached issue with its metadata."""
+    id: int
+    repo: str
+    title: str
+    body: str
+    html_url: str
+    created_at: str
+    updated_at: Optional[str] = None
+    state: str
+    labels: List[str]
+    assignees: List[str]
+    milestone: Optional[str] = None
+    comments: int
+    reactions: int
+
+
+class IssueListResponse(BaseModel):
+    """Response body for the issue listing and GET /search endpoints."""
+    total: int
+    filter: str
+    issues: List[IssueResponse]
+
+
+class PromptAnalysis(BaseModel):
+    """Analysis result for one prompt of a batch."""
+    prompt: str
+    analysis: str
+
+
+class AnalyzeBatchResponse(BaseModel):
+    """Response body for POST /analyze/batch endpoint."""
+    repo: str
+    results: List[PromptAnalysis]
+
+
+class JobResponse(BaseModel):
+    """A scan or analysis job, as seen by every worker."""
+    id: str
+    kind: str
+    repo: str
+    status: str
+    owner: str
+    created_at: str
+    updated_at: str
+    error: Optional[str] = None
+
+
+class AnalysisJobResponse(JobResponse):
+    """An analysis job with its request, progress and result."""
+    prompt: str
+    mode: str
+    filter: Optional[str] = None
+    checkpoints: int
+    result: Optional[str] = None
+
+
+class WebhookResponse(BaseModel):
+    """Response body for POST /webhooks/github endpoint."""
+    event: str
+    status: str
+    action: Optional[str] = None
+
+
+class ImportResponse(BaseModel):
+    """Response body for POST /snapshots/import endpoint."""
+    repos: List[str]
+    issues_imported: int
 
 
 class HealthResponse(BaseModel):
@@ -0,0 +1,13 @@
+"""Admin authentication for diagnostic and maintenance endpoints."""
+
+import hmac
+
+from fastapi import Request
+
+from app.config import settings
+
+
+def is_admin(request: Request) -> bool:
+    """Check the X-Admin-Token header against ADMIN_TOKEN (never true when unset)."""
+    token = request.headers.get("X-Admin-Token", "")
+    return bool(settings.ADMIN_TOKEN) and hmac.compare_digest(token, settings.ADMIN_TOKEN)
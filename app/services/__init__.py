@@ -2,10 +2,19 @@
 
 from app.services.scan_service import ScanService, scan_service
 from app.services.analyze_service import AnalyzeService, analyze_service
+from app.services.webhook_service import WebhookService, webhook_service
+from app.services.snapshot_service import SnapshotService, snapshot_service
+from app.services.search_service import SearchService, search_service
 
 __all__ = [
     "ScanService",
     "scan_service",
     "AnalyzeService", 
-    "analyze_service"
+    "analyze_service",
+    "WebhookService",
+    "webhook_service",
+    "SnapshotService",
+    "snapshot_service",
+    "SearchService",
+    "search_service"
 ]
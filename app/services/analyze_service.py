@@ -1,23 +1,66 @@
 """Analyze service - Business logic for analyzing issues."""
 
+import asyncio
+import hashlib
 import logging
-from typing import List
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set
 
-from app.clients.llm_client import llm_client
-from app.repositories.issue_repository import issue_repository
-from app.exceptions import RepositoryNotFoundError, NoIssuesFoundError, LLMError
+from app import timing
+from app.clients.llm_client import LLMClient, get_llm_client
+from app.repositories.issue_repository import IssueRepository, issue_repository
+from app.repositories.issue_filter import IssueFilter, parse_filter
+from app.repositories.coordination_repository import (
+    CoordinationRepository,
+    RunCheckpoints,
+    coordination_repository
+)
+from app.exceptions import (
+    RepositoryNotFoundError,
+    NoIssuesFoundError,
+    LLMError,
+    JobNotFoundError,
+    JobNotResumableError
+)
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class BudgetedAnalysis:
+    """Result of an analysis run within a latency or token budget."""
+    analysis: str
+    partial: bool
+    issues_analyzed: int
+
+
 class AnalyzeService:
     """Service for analyzing GitHub issues."""
     
+    def __init__(
+        self,
+        llm: Optional[LLMClient] = None,
+        repository: Optional[IssueRepository] = None,
+        coordination: Optional[CoordinationRepository] = None
+    ):
+        self._llm = llm
+        self.repository = repository or issue_repository
+        self.coordination = coordination or coordination_repository
+        # Keeps background analysis jobs referenced until they finish
+        self._jobs: Set[asyncio.Task] = set()
+    
+    @property
+    def llm(self) -> LLMClient:
+        """Injected LLM client, or the shared one built at startup."""
+        return self._llm or get_llm_client()
+    
     async def analyze_issues(
         self, 
         repo: str, 
         prompt: str, 
-        mode: str = "fast"
+        mode: str = "fast",
+        filter_expression: Optional[str] = None
     ) -> str:
         """
         Analyze cached issues for a repository using LLM.
@@ -26,41 +69,333 @@ class AnalyzeService:
             repo: Repository in 'owner/repo' format
             prompt: Analysis prompt
             mode: 'fast' (50 issues) or 'default' (all issues)
+            filter_expression: Only analyze issues matching this filter (see parse_filter)
             
         Returns:
             Analysis result from LLM
             
         Raises:
+            InvalidFilterError: If the filter cannot be parsed
             RepositoryNotFoundError: If repo hasn't been scanned
             NoIssuesFoundError: If no issues found
             LLMError: If LLM analysis fails
         """
         logger.info(f"Analyzing repository: {repo}")
+        issue_filter = self._parse_filter(filter_expression)
         
+        # SQLite calls run in worker threads to keep the event loop responsive
         # Check if repository has been scanned
-        if not issue_repository.has_repo(repo):
+        if not await asyncio.to_thread(self.repository.has_repo, repo):
             raise RepositoryNotFoundError(repo)
         
-        # Get cached issues
-        issues = issue_repository.get_issues_by_repo(repo)
-        
-        if not issues:
-            raise NoIssuesFoundError(repo)
+        # Any worker may already have answered this prompt for the current contents
+        version = await asyncio.to_thread(self.repository.get_repo_version, repo)
+        cache_key = self._cache_key(repo, version, prompt, self._scope(mode, issue_filter))
+        cached = await asyncio.to_thread(self.coordination.get_analysis, cache_key)
+        if cached is not None:
+            logger.info("Returning shared cached analysis")
+            await asyncio.to_thread(self.repository.mark_accessed, repo)
+            return cached
         
-        logger.info(f"Found {len(issues)} cached issues for analysis")
+        issues = await self._load_issues(repo, mode, issue_filter)
         
-        # Apply mode: fast (50 issues) or default (all)
-        if mode == "fast" and len(issues) > 50:
-            logger.info("Fast mode: Limiting to 50 most recent issues")
-            issues = issues[:50]
+        # Analyze with LLM, recorded as a job visible to every worker.
+        # A failed or abandoned run of the same request resumes from its checkpoints.
+        filter_key = issue_filter.key if issue_filter else ""
+        job_id = await asyncio.to_thread(
+            self.coordination.claim_resumable_run, repo, prompt, mode, version, filter_key
+        )
+        if job_id is None:
+            job_id = await asyncio.to_thread(self.coordination.create_run, repo, prompt, mode, version, filter_key)
         else:
-            logger.info(f"Default mode: Analyzing all {len(issues)} issues")
-        
-        # Analyze with LLM
-        analysis = await llm_client.analyze(prompt, issues)
+            logger.info(f"Resuming analysis run {job_id}")
+        analysis = await self._execute_run(job_id, repo, prompt, issues, cache_key)
         logger.info("LLM analysis completed successfully")
+        return analysis
+    
+    async def analyze_within_budget(
+        self,
+        repo: str,
+        prompt: str,
+        mode: str = "fast",
+        latency_budget: Optional[float] = None,
+        token_budget: Optional[int] = None,
+        filter_expression: Optional[str] = None
+    ) -> BudgetedAnalysis:
+        """
+        Analyze cached issues within a latency and/or token budget.
+        
+        A planner picks how many of the most recent issues to analyze (within the mode's
+        limit), the chunk size, the map concurrency and the reduce fan-in from measured
+        LLM call statistics. If the deadline nears anyway, the best partial synthesis
+        is returned. Results covering fewer than all selected issues are flagged as partial.
+        
+        Args:
+            repo: Repository in 'owner/repo' format
+            prompt: Analysis prompt
+            mode: 'fast' (50 issues) or 'default' (all issues)
+            latency_budget: Seconds the whole request may take
+            token_budget: LLM tokens (input and output) the analysis may use
+            filter_expression: Only analyze issues matching this filter (see parse_filter)
+            
+        Raises:
+            InvalidFilterError: If the filter cannot be parsed
+            RepositoryNotFoundError: If repo hasn't been scanned
+            NoIssuesFoundError: If no issues found
+            AnalysisBudgetExceededError: If the deadline passed before anything was summarized,
+                or not even one issue fits the token budget
+            LLMError: If LLM analysis fails
+        """
+        # The latency budget covers the whole request, including loading the issues
+        deadline = time.monotonic() + latency_budget if latency_budget is not None else None
+        logger.info(f"Analyzing repository within budget: {repo}")
+        issue_filter = self._parse_filter(filter_expression)
         
+        if not await asyncio.to_thread(self.repository.has_repo, repo):
+            raise RepositoryNotFoundError(repo)
+        
+        issues = await self._load_issues(repo, mode, issue_filter)
+        remaining = deadline - time.monotonic() if deadline is not None else None
+        with timing.span("analyze.plan"):
+            plan = self.llm.plan(issues, remaining, token_budget)
+        logger.info(f"Analysis plan: {plan}")
+        
+        version = await asyncio.to_thread(self.repository.get_repo_version, repo)
+        cache_key = self._cache_key(repo, version, prompt, f"{self._scope(mode, issue_filter)}:plan:{plan.key}")
+        cached = await asyncio.to_thread(self.coordination.get_analysis, cache_key)
+        if cached is not None:
+            logger.info("Returning shared cached analysis")
+            return BudgetedAnalysis(
+                analysis=cached, partial=plan.issue_count < len(issues), issues_analyzed=plan.issue_count
+            )
+        
+        job_id = await asyncio.to_thread(self.coordination.create_job, "analyze", repo)
+        try:
+            with timing.span("analyze.llm"):
+                analysis, partial, issues_analyzed = await self.llm.analyze_within(prompt, issues, plan, deadline)
+        except Exception as e:
+            await asyncio.to_thread(self.coordination.finish_job, job_id, str(e) or type(e).__name__)
+            raise
+        await asyncio.to_thread(self.coordination.finish_job, job_id)
+        logger.info(f"Budgeted analysis completed (partial={partial})")
+        
+        # Partial results depend on timing, so only complete ones are shared
+        if not partial:
+            await asyncio.to_thread(self.coordination.put_analysis, cache_key, repo, analysis)
+        # Issues the planner left out to fit the budget make the result partial as well
+        return BudgetedAnalysis(
+            analysis=analysis, partial=partial or issues_analyzed < len(issues), issues_analyzed=issues_analyzed
+        )
+    
+    async def start_analysis_job(
+        self,
+        repo: str,
+        prompt: str,
+        mode: str = "fast",
+        filter_expression: Optional[str] = None
+    ) -> dict:
+        """
+        Start an analysis in the background and return its job right away.
+        
+        Raises:
+            InvalidFilterError: If the filter cannot be parsed
+            RepositoryNotFoundError: If repo hasn't been scanned
+        """
+        issue_filter = self._parse_filter(filter_expression)
+        if not await asyncio.to_thread(self.repository.has_repo, repo):
+            raise RepositoryNotFoundError(repo)
+        
+        # The run keeps the resolved filter, so a resume selects the same issues
+        version = await asyncio.to_thread(self.repository.get_repo_version, repo)
+        job_id = await asyncio.to_thread(
+            self.coordination.create_run, repo, prompt, mode, version, issue_filter.key if issue_filter else ""
+        )
+        self._spawn_job(job_id)
+        return await asyncio.to_thread(self.coordination.get_run, job_id)
+    
+    async def resume_analysis_job(self, job_id: str) -> dict:
+        """
+        Resume a failed or stalled analysis job in the background; completed steps are not redone.
+        
+        Raises:
+            JobNotFoundError: If there is no analysis job with this id
+            JobNotResumableError: If the job is still running and making progress
+        """
+        run = await self.get_analysis_job(job_id)
+        if run["status"] == "succeeded":
+            return run
+        
+        if not await asyncio.to_thread(self.coordination.claim_run, job_id):
+            raise JobNotResumableError(job_id)
+        self._spawn_job(job_id)
+        return await asyncio.to_thread(self.coordination.get_run, job_id)
+    
+    async def get_analysis_job(self, job_id: str) -> dict:
+        """
+        Get an analysis job with its request, progress and result.
+        
+        Raises:
+            JobNotFoundError: If there is no analysis job with this id
+        """
+        run = await asyncio.to_thread(self.coordination.get_run, job_id)
+        if run is None:
+            raise JobNotFoundError(job_id)
+        return run
+    
+    def _spawn_job(self, job_id: str) -> None:
+        task = asyncio.get_running_loop().create_task(self._run_job(job_id))
+        self._jobs.add(task)
+        task.add_done_callback(self._jobs.discard)
+    
+    async def _run_job(self, job_id: str) -> None:
+        """Run a background analysis job; failures are recorded on the job."""
+        run = await asyncio.to_thread(self.coordination.get_run, job_id)
+        repo, prompt, mode = run["repo"], run["prompt"], run["mode"]
+        try:
+            issue_filter = self._parse_filter(run["filter"])
+            version = await asyncio.to_thread(self.repository.get_repo_version, repo)
+            if version != run["version"]:
+                # The issues changed since the checkpoints were made
+                await asyncio.to_thread(self.coordination.reset_run, job_id, version)
+            
+            cache_key = self._cache_key(repo, version, prompt, self._scope(mode, issue_filter))
+            analysis = await asyncio.to_thread(self.coordination.get_analysis, cache_key)
+            if analysis is not None:
+                await asyncio.to_thread(self.coordination.finish_run, job_id, cache_key)
+                return
+            
+            issues = await self._load_issues(repo, mode, issue_filter)
+            await self._execute_run(job_id, repo, prompt, issues, cache_key)
+            logger.info(f"Analysis job {job_id} completed")
+        except Exception as e:
+            logger.error(f"Analysis job {job_id} failed: {e}")
+            await asyncio.to_thread(self.coordination.finish_job, job_id, str(e) or type(e).__name__)
+    
+    async def _execute_run(self, job_id: str, repo: str, prompt: str, issues: List[dict], cache_key: str) -> str:
+        """
+        Run the LLM analysis of a job, checkpointing every map and reduce step under its id.
+        The result is shared under `cache_key`, which the finished run then refers to.
+        """
+        checkpoints = RunCheckpoints(self.coordination, job_id)
+        await asyncio.to_thread(checkpoints.load)
+        try:
+            with timing.span("analyze.llm"):
+                analysis = await self.llm.analyze(prompt, issues, checkpoints=checkpoints)
+        except asyncio.CancelledError:
+            # e.g. the client disconnected; completed steps stay checkpointed for a retry
+            await asyncio.to_thread(self.coordination.finish_job, job_id, "cancelled")
+            raise
+        except Exception as e:
+            await asyncio.to_thread(self.coordination.finish_job, job_id, str(e) or type(e).__name__)
+            raise
+        await asyncio.to_thread(self.coordination.put_analysis, cache_key, repo, analysis)
+        await asyncio.to_thread(self.coordination.finish_run, job_id, cache_key)
         return analysis
+    
+    async def analyze_batch(
+        self,
+        repo: str,
+        prompts: List[str],
+        mode: str = "fast",
+        filter_expression: Optional[str] = None
+    ) -> Dict[str, str]:
+        """
+        Answer several prompts about one repository with a shared map pass.
+        
+        Args:
+            repo: Repository in 'owner/repo' format
+            prompts: Analysis prompts (duplicates are answered once)
+            mode: 'fast' (50 issues) or 'default' (all issues)
+            filter_expression: Only analyze issues matching this filter (see parse_filter)
+            
+        Returns:
+            Analysis result per prompt, in the order of `prompts`
+            
+        Raises:
+            InvalidFilterError: If the filter cannot be parsed
+            RepositoryNotFoundError: If repo hasn't been scanned
+            NoIssuesFoundError: If no issues found
+            LLMError: If LLM analysis fails
+        """
+        logger.info(f"Batch analyzing repository: {repo} ({len(prompts)} prompts)")
+        issue_filter = self._parse_filter(filter_expression)
+        
+        if not await asyncio.to_thread(self.repository.has_repo, repo):
+            raise RepositoryNotFoundError(repo)
+        
+        # Batch answers come from shared facts, so they are cached apart from single analyses
+        version = await asyncio.to_thread(self.repository.get_repo_version, repo)
+        batch_mode = f"{self._scope(mode, issue_filter)}:batch"
+        results: Dict[str, str] = {}
+        for prompt in dict.fromkeys(prompts):
+            cached = await asyncio.to_thread(
+                self.coordination.get_analysis, self._cache_key(repo, version, prompt, batch_mode)
+            )
+            if cached is not None:
+                results[prompt] = cached
+        
+        missing = [prompt for prompt in dict.fromkeys(prompts) if prompt not in results]
+        if not missing:
+            logger.info("Returning shared cached batch analysis")
+            await asyncio.to_thread(self.repository.mark_accessed, repo)
+            return results
+        
+        issues = await self._load_issues(repo, mode, issue_filter)
+        
+        job_id = await asyncio.to_thread(self.coordination.create_job, "analyze_batch", repo)
+        try:
+            with timing.span("analyze.llm"):
+                analyses = await self.llm.analyze_batch(missing, issues)
+        except Exception as e:
+            await asyncio.to_thread(self.coordination.finish_job, job_id, str(e) or type(e).__name__)
+            raise
+        await asyncio.to_thread(self.coordination.finish_job, job_id)
+        logger.info(f"Batch analysis completed for {len(missing)} prompts")
+        
+        for prompt, analysis in zip(missing, analyses):
+            results[prompt] = analysis
+            await asyncio.to_thread(
+                self.coordination.put_analysis, self._cache_key(repo, version, prompt, batch_mode), repo, analysis
+            )
+        return {prompt: results[prompt] for prompt in dict.fromkeys(prompts)}
+    
+    async def _load_issues(self, repo: str, mode: str, issue_filter: Optional[IssueFilter] = None) -> List[dict]:
+        """
+        Load the cached issues to analyze.
+        The filter and the mode's issue limit (fast: 50 most recent) are applied in SQLite.
+        """
+        limit = 50 if mode == "fast" else None
+        with timing.span("analyze.load_issues"):
+            issues = await asyncio.to_thread(self.repository.get_issues_by_repo, repo, issue_filter, limit)
+        
+        if not issues:
+            raise NoIssuesFoundError(repo, issue_filter.key if issue_filter else None)
+        
+        logger.info(f"Loaded {len(issues)} cached issues for analysis ({mode} mode)")
+        
+        # Record the access so LRU eviction keeps actively analyzed repos
+        await asyncio.to_thread(self.repository.mark_accessed, repo)
+        
+        return issues
+    
+    @staticmethod
+    def _parse_filter(expression: Optional[str]) -> Optional[IssueFilter]:
+        """Parse a filter expression; None or a blank expression means no filter."""
+        if not expression:
+            return None
+        issue_filter = parse_filter(expression)
+        return issue_filter if issue_filter.conditions else None
+    
+    @staticmethod
+    def _scope(mode: str, issue_filter: Optional[IssueFilter]) -> str:
+        """Mode part of a cache key; filtered analyses cover other issues than the mode alone."""
+        return f"{mode}:filter:{issue_filter.key}" if issue_filter else mode
+    
+    @staticmethod
+    def _cache_key(repo: str, version: int, prompt: str, mode: str) -> str:
+        """Key for a shared analysis result; a new repo version yields a new key."""
+        raw = "\0".join([repo, str(version), mode, prompt])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
 
 
 # Singleton instance
@@ -1,12 +1,16 @@
 """Scan service - Business logic for scanning repositories."""
 
+import asyncio
 import logging
-from dataclasses import dataclass
-from typing import List
+from dataclasses import asdict, dataclass
+from typing import List, Optional
 
-from app.clients.github_client import github_client
-from app.repositories.issue_repository import issue_repository
-from app.exceptions import GitHubClientError
+from app import timing
+from app.config import settings
+from app.clients.github_client import GitHubClient, get_github_client
+from app.repositories.issue_repository import IssueRepository, issue_repository
+from app.repositories.coordination_repository import CoordinationRepository, coordination_repository
+from app.exceptions import GitHubClientError, ScanInProgressError
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +26,21 @@ class ScanResult:
 class ScanService:
     """Service for scanning GitHub repositories."""
     
+    def __init__(
+        self,
+        github: Optional[GitHubClient] = None,
+        repository: Optional[IssueRepository] = None,
+        coordination: Optional[CoordinationRepository] = None
+    ):
+        self._github = github
+        self.repository = repository or issue_repository
+        self.coordination = coordination or coordination_repository
+    
+    @property
+    def github(self) -> GitHubClient:
+        """Injected GitHub client, or the shared one built at startup."""
+        return self._github or get_github_client()
+    
     async def scan_repository(self, repo: str) -> ScanResult:
         """
         Fetch all open issues from a GitHub repository and cache them.
@@ -34,32 +53,61 @@ class ScanService:
             
         Raises:
             GitHubClientError: If GitHub API fails
+            ScanInProgressError: If another worker is scanning the repo
         """
         logger.info(f"Scanning repository: {repo}")
         
+        # Only one worker scans a repo at a time; the lease expires if a worker dies
+        lease = await asyncio.to_thread(self.coordination.acquire_scan_lease, repo)
+        if lease is None:
+            raise ScanInProgressError(repo)
+        
+        try:
+            job_id = await asyncio.to_thread(self.coordination.create_job, "scan", repo)
+            # Scans may outlast the lease TTL; keep it renewed while this worker is alive
+            renewal = asyncio.create_task(self._renew_lease(repo, lease))
+            try:
+                result = await self._scan(repo)
+            except Exception as e:
+                await asyncio.to_thread(self.coordination.finish_job, job_id, str(e) or type(e).__name__)
+                raise
+            finally:
+                renewal.cancel()
+        finally:
+            await asyncio.to_thread(self.coordination.release_scan_lease, repo, lease)
+        
+        await asyncio.to_thread(self.coordination.finish_job, job_id)
+        return result
+    
+    async def _renew_lease(self, repo: str, lease: str) -> None:
+        """Extend a scan lease every third of its TTL until cancelled or the lease is lost."""
+        while True:
+            await asyncio.sleep(settings.SCAN_LEASE_TTL_SECONDS / 3)
+            if not await asyncio.to_thread(self.coordination.renew_scan_lease, repo, lease):
+                logger.warning(f"Lost the scan lease of {repo}; another worker may be scanning it")
+                return
+    
+    async def _scan(self, repo: str) -> ScanResult:
+        """Fetch and store issues for a repo while holding its scan lease."""
         # Parse owner and repo
         owner, repo_name = repo.split("/")
         
         # Fetch issues from GitHub
-        issues = await github_client.fetch_open_issues(owner, repo_name)
+        with timing.span("scan.fetch"):
+            issues = await self.github.fetch_open_issues(owner, repo_name)
         logger.info(f"Fetched {len(issues)} issues from GitHub")
         
-        # Convert Issue objects to dicts for storage
-        issues_data = [
-            {
-                "id": issue.id,
-                "title": issue.title,
-                "body": issue.body,
-                "html_url": issue.html_url,
-                "created_at": issue.created_at
-            }
-            for issue in issues
-        ]
+        # Convert Issue objects (with their labels, assignees and other metadata) to dicts for storage
+        issues_data = [asdict(issue) for issue in issues]
         
-        # Save to database
-        count = issue_repository.save_issues(repo, issues_data)
+        # Save to database (in a worker thread to keep the event loop responsive)
+        with timing.span("scan.save"):
+            count = await asyncio.to_thread(self.repository.save_issues, repo, issues_data)
         logger.info(f"Cached {count} issues successfully")
         
+        # Analyses of the previous contents are stale for every worker
+        await asyncio.to_thread(self.coordination.invalidate_repo, repo)
+        
         return ScanResult(
             repo=repo,
             issues_fetched=count,
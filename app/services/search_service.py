@@ -0,0 +1,69 @@
+"""Search service - Filtered listing and search of cached issues."""
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import List, Optional
+
+from app.repositories.issue_repository import IssueRepository, issue_repository
+from app.repositories.issue_filter import IssueFilter, parse_filter
+from app.exceptions import RepositoryNotFoundError
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class IssuePage:
+    """One page of matching issues."""
+    total: int
+    filter: str
+    issues: List[dict]
+
+
+class SearchService:
+    """
+    Service for querying the issue cache with filter expressions.
+
+    Filters compile to SQL, so only the requested page of matching issues is
+    ever loaded into Python.
+    """
+    
+    def __init__(self, repository: Optional[IssueRepository] = None):
+        self.repository = repository or issue_repository
+    
+    async def list_issues(self, repo: str, expression: str = "", limit: int = 30, offset: int = 0) -> IssuePage:
+        """
+        List the cached issues of a repository that match a filter, newest first.
+        
+        Raises:
+            InvalidFilterError: If the filter cannot be parsed
+            RepositoryNotFoundError: If repo hasn't been scanned
+        """
+        issue_filter = parse_filter(expression)
+        if not await asyncio.to_thread(self.repository.has_repo, repo):
+            raise RepositoryNotFoundError(repo)
+        
+        page = await self._page(repo, issue_filter, limit, offset)
+        await asyncio.to_thread(self.repository.mark_accessed, repo)
+        return page
+    
+    async def search(self, expression: str = "", limit: int = 30, offset: int = 0) -> IssuePage:
+        """
+        Search the cached issues of every repo (narrow it with `repo:owner/name`), newest first.
+        
+        Raises:
+            InvalidFilterError: If the filter cannot be parsed
+        """
+        return await self._page(None, parse_filter(expression), limit, offset)
+    
+    async def _page(self, repo: Optional[str], issue_filter: IssueFilter, limit: int, offset: int) -> IssuePage:
+        total = await asyncio.to_thread(self.repository.get_issue_count, repo, issue_filter)
+        issues = []
+        if offset < total:
+            issues = await asyncio.to_thread(self.repository.search_issues, repo, issue_filter, limit, offset)
+        logger.info(f"Filter '{issue_filter.key}' matched {total} issues in {repo or 'all repos'}")
+        return IssuePage(total=total, filter=issue_filter.key, issues=issues)
+
+
+# Singleton instance
+search_service = SearchService()
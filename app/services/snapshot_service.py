@@ -0,0 +1,194 @@
+"""Snapshot service - NDJSON export and bulk import of the issue cache."""
+
+import asyncio
+import json
+import logging
+import re
+import zlib
+from contextlib import closing
+from dataclasses import dataclass
+from typing import AsyncIterator, Iterator, List, Optional
+
+from app.config import settings
+from app.exceptions import SnapshotFormatError
+from app.repositories.issue_repository import IssueRepository, SnapshotImport, issue_repository
+from app.repositories.coordination_repository import CoordinationRepository, coordination_repository
+
+logger = logging.getLogger(__name__)
+
+GZIP_MAGIC = b"\x1f\x8b"
+REPO_PATTERN = re.compile(r'^[a-zA-Z0-9_.-]+/[a-zA-Z0-9_.-]+$')
+# Exported lines are written out in blocks of about this size
+EXPORT_BLOCK_BYTES = 64 * 1024
+
+
+def _valid_metadata(issue: dict) -> bool:
+    """Check the optional metadata fields of an imported issue."""
+    return (
+        all(isinstance(issue.get(field) or "", str) for field in ("updated_at", "state", "milestone"))
+        and all(
+            isinstance(issue.get(field) or [], list) and all(isinstance(v, str) for v in issue.get(field) or [])
+            for field in ("labels", "assignees")
+        )
+        and all(type(issue.get(field) or 0) is int for field in ("comments", "reactions"))
+    )
+
+
+@dataclass
+class ImportResult:
+    """Result of a snapshot import."""
+    repos: List[str]
+    issues_imported: int
+
+
+class SnapshotService:
+    """
+    Service for moving the issue cache between nodes without re-crawling GitHub.
+
+    Snapshots are NDJSON: one issue object (id, repo, title, body, html_url,
+    created_at, updated_at, state, labels, assignees, milestone, comments,
+    reactions) per line, optionally gzip-compressed. The metadata fields are
+    optional on import, so older snapshots still load.
+    """
+    
+    def __init__(
+        self,
+        repository: Optional[IssueRepository] = None,
+        coordination: Optional[CoordinationRepository] = None
+    ):
+        self.repository = repository or issue_repository
+        self.coordination = coordination or coordination_repository
+    
+    def export_ndjson(self, repo: Optional[str] = None, gzip: bool = False) -> Iterator[bytes]:
+        """
+        Stream the cached issues of one repo (or all repos) as NDJSON.
+        
+        This is a plain generator: StreamingResponse advances it in the threadpool,
+        so the SQLite reads and compression never run on the event loop. Closing it
+        closes the underlying SQLite read right away.
+        """
+        compressor = None
+        if gzip:
+            compressor = zlib.compressobj(settings.BODY_COMPRESSION_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        
+        block: List[bytes] = []
+        size = 0
+        with closing(self.repository.iter_issues(repo, settings.SNAPSHOT_BATCH_SIZE)) as issues:
+            for issue in issues:
+                line = json.dumps(issue, ensure_ascii=False).encode("utf-8") + b"\n"
+                block.append(line)
+                size += len(line)
+                if size >= EXPORT_BLOCK_BYTES:
+                    data = b"".join(block)
+                    block, size = [], 0
+                    if compressor is not None:
+                        data = compressor.compress(data)
+                    if data:
+                        yield data
+        
+        data = b"".join(block)
+        if compressor is not None:
+            data = compressor.compress(data) + compressor.flush()
+        if data:
+            yield data
+    
+    async def import_ndjson(self, chunks: AsyncIterator[bytes]) -> ImportResult:
+        """
+        Replace cached repos with the issues of an NDJSON snapshot stream.
+        
+        Gzip input is detected automatically. Lines are staged in batches and every
+        repo in the snapshot is swapped in atomically at the end; repos that are not
+        in the snapshot are left untouched.
+        
+        Args:
+            chunks: Raw request body chunks
+            
+        Returns:
+            ImportResult with the imported repos and issue count
+            
+        Raises:
+            SnapshotFormatError: If a line is malformed (nothing is imported)
+        """
+        loader = await asyncio.to_thread(self.repository.begin_import)
+        try:
+            decompressor = None
+            started = False
+            pending = b""
+            lines: List[bytes] = []
+            line_no = 1
+            
+            async for chunk in chunks:
+                if not chunk:
+                    continue
+                if not started:
+                    started = True
+                    if chunk.startswith(GZIP_MAGIC):
+                        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+                if decompressor is not None:
+                    chunk = self._decompress(decompressor, chunk)
+                
+                *complete, pending = (pending + chunk).split(b"\n")
+                lines.extend(complete)
+                if len(lines) >= settings.SNAPSHOT_BATCH_SIZE:
+                    await asyncio.to_thread(self._stage, loader, lines, line_no)
+                    line_no += len(lines)
+                    lines = []
+            
+            if decompressor is not None:
+                pending += self._decompress(decompressor, b"")
+                if not decompressor.eof:
+                    raise SnapshotFormatError("Truncated gzip snapshot")
+            lines.append(pending)
+            await asyncio.to_thread(self._stage, loader, lines, line_no)
+            
+            imported = await asyncio.to_thread(loader.commit)
+        finally:
+            await asyncio.to_thread(loader.close)
+        
+        # Cached analyses of the replaced repos no longer match their issues
+        for repo, _ in imported:
+            await asyncio.to_thread(self.coordination.invalidate_repo, repo)
+        
+        return ImportResult(
+            repos=[repo for repo, _ in imported],
+            issues_imported=sum(count for _, count in imported)
+        )
+    
+    @staticmethod
+    def _decompress(decompressor, data: bytes) -> bytes:
+        try:
+            return decompressor.decompress(data) if data else decompressor.flush()
+        except zlib.error:
+            raise SnapshotFormatError("Invalid gzip snapshot")
+    
+    @staticmethod
+    def _stage(loader: SnapshotImport, lines: List[bytes], first_line: int) -> None:
+        """Parse and validate a batch of lines, then stage them."""
+        issues = []
+        for line_no, raw in enumerate(lines, start=first_line):
+            if not raw.strip():
+                continue
+            try:
+                issue = json.loads(raw)
+                valid = (
+                    isinstance(issue["id"], int)
+                    and isinstance(issue["repo"], str) and REPO_PATTERN.match(issue["repo"])
+                    and all(isinstance(issue[field], str) for field in ("title", "html_url", "created_at"))
+                    and isinstance(issue.get("body") or "", str)
+                    and _valid_metadata(issue)
+                )
+            except (ValueError, KeyError, TypeError):
+                valid = False
+            if not valid:
+                raise SnapshotFormatError(
+                    f"Line {line_no}: expected an issue object with id, repo, title, body, html_url and created_at "
+                    f"(and optionally updated_at, state, labels, assignees, milestone, comments and reactions)"
+                )
+            issues.append(issue)
+        
+        if issues:
+            loader.add(issues)
+
+
+# Singleton instance
+snapshot_service = SnapshotService()
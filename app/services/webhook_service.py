@@ -0,0 +1,149 @@
+"""Webhook service - Applies GitHub issue events to the cache."""
+
+import asyncio
+import hashlib
+import hmac
+import logging
+from dataclasses import asdict
+from typing import Dict, List, Optional, Set, Tuple
+
+from app.clients.github_client import parse_issue
+from app.config import settings
+from app.exceptions import WebhookSignatureError
+from app.repositories.issue_repository import IssueRepository, issue_repository
+from app.repositories.coordination_repository import CoordinationRepository, coordination_repository
+
+logger = logging.getLogger(__name__)
+
+# Actions after which the issue is no longer an open issue of the repo
+REMOVE_ACTIONS = {"closed", "deleted", "transferred"}
+
+
+def verify_signature(body: bytes, signature: Optional[str]) -> None:
+    """
+    Check the X-Hub-Signature-256 header against GITHUB_WEBHOOK_SECRET.
+
+    Raises:
+        WebhookSignatureError: If no secret is configured or the signature does not match
+    """
+    if not settings.GITHUB_WEBHOOK_SECRET:
+        raise WebhookSignatureError("Webhook secret not configured")
+    expected = "sha256=" + hmac.new(
+        settings.GITHUB_WEBHOOK_SECRET.encode("utf-8"), body, hashlib.sha256
+    ).hexdigest()
+    if not signature or not hmac.compare_digest(signature, expected):
+        raise WebhookSignatureError("Invalid webhook signature")
+
+
+class WebhookService:
+    """
+    Service for applying GitHub `issues` events to the cache.
+
+    Events arriving within a short window are batched and written in one
+    transaction; each request waits until its event has been committed.
+    """
+    
+    def __init__(
+        self,
+        repository: Optional[IssueRepository] = None,
+        coordination: Optional[CoordinationRepository] = None
+    ):
+        self.repository = repository or issue_repository
+        self.coordination = coordination or coordination_repository
+        self._pending: List[Tuple[str, str, dict, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        # Keeps running flush tasks referenced until they finish
+        self._flush_tasks: Set[asyncio.Task] = set()
+        # Flushes write one after another, so a later event never lands before an earlier one
+        self._flush_lock = asyncio.Lock()
+    
+    async def handle_issue_event(self, payload: dict) -> bool:
+        """
+        Queue an `issues` event and wait until its batch is written.
+
+        Args:
+            payload: Parsed webhook payload
+
+        Returns:
+            True if the event changed the cache (False for repos that were never scanned)
+        """
+        repo = payload["repository"]["full_name"]
+        action = payload["action"]
+        issue = payload["issue"]
+        
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((repo, action, issue, future))
+        
+        if len(self._pending) >= settings.WEBHOOK_BATCH_MAX:
+            self._schedule_flush(0)
+        elif self._flush_handle is None:
+            self._schedule_flush(settings.WEBHOOK_BATCH_WINDOW_MS / 1000)
+        
+        return await future
+    
+    def _schedule_flush(self, delay: float) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+        self._flush_handle = asyncio.get_running_loop().call_later(delay, self._start_flush)
+    
+    def _start_flush(self) -> None:
+        task = asyncio.get_running_loop().create_task(self._flush())
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+    
+    async def _flush(self) -> None:
+        """Write all pending events once any earlier flush has finished writing."""
+        self._flush_handle = None
+        async with self._flush_lock:
+            await self._write_pending()
+    
+    async def _write_pending(self) -> None:
+        """Write all pending events in one transaction and resolve their waiters."""
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        
+        # Only the last event per issue matters (e.g. edited, then closed)
+        latest: Dict[int, Tuple[str, str, dict]] = {}
+        for repo, action, issue, _ in batch:
+            latest[issue["id"]] = (repo, action, issue)
+        
+        upserts = []
+        deletes = []
+        # A malformed issue fails only its own events, not the whole batch
+        malformed: Dict[int, Exception] = {}
+        for issue_id, (repo, action, issue) in latest.items():
+            if action in REMOVE_ACTIONS or issue.get("state") == "closed" or "pull_request" in issue:
+                deletes.append((repo, issue_id))
+                continue
+            try:
+                upserts.append((repo, asdict(parse_issue(issue))))
+            except (KeyError, TypeError, AttributeError) as e:
+                logger.warning(f"Skipping malformed webhook issue {issue_id}: missing or invalid {e}")
+                malformed[issue_id] = ValueError(f"Malformed issue {issue_id}")
+        
+        try:
+            touched = await asyncio.to_thread(self.repository.apply_issue_changes, upserts, deletes)
+            # Cached analyses of these repos no longer match their issues
+            for repo in touched:
+                await asyncio.to_thread(self.coordination.invalidate_repo, repo)
+        except Exception as e:
+            logger.error(f"Failed to apply {len(batch)} webhook events: {e}")
+            for *_, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        logger.info(f"Applied {len(batch)} webhook events to {len(touched)} cached repos")
+        for repo, _, issue, future in batch:
+            if future.done():
+                continue
+            if issue["id"] in malformed:
+                future.set_exception(malformed[issue["id"]])
+            else:
+                future.set_result(repo in touched)
+
+
+# Singleton instance
+webhook_service = WebhookService()
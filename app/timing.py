@@ -0,0 +1,52 @@
+"""Per-request timing spans, reported through the Server-Timing header."""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Spans recorded for the current request; None outside a timed request
+_spans: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar("request_spans", default=None)
+
+
+def begin_request() -> None:
+    """Start collecting spans for the current request."""
+    _spans.set([])
+
+
+def record(name: str, seconds: float) -> None:
+    """Record a finished span (no-op outside a timed request)."""
+    spans = _spans.get()
+    if spans is not None:
+        spans.append((name, seconds))
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Time the enclosed block as a span of the current request."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start)
+
+
+def server_timing_header(total: float) -> str:
+    """
+    Build the Server-Timing header value for the current request.
+    Repeated spans (e.g. one per map call) are summed and annotated with their count.
+    """
+    totals: Dict[str, List[float]] = {}
+    for name, seconds in _spans.get() or []:
+        entry = totals.setdefault(name, [0.0, 0])
+        entry[0] += seconds
+        entry[1] += 1
+    
+    metrics = []
+    for name, (seconds, count) in totals.items():
+        metric = f"{name};dur={seconds * 1000:.1f}"
+        if count > 1:
+            metric += f';desc="{count} calls"'
+        metrics.append(metric)
+    metrics.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(metrics)
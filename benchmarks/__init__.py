@@ -0,0 +1 @@
+"""Benchmarks package - Offline performance benchmarks."""
@@ -0,0 +1,145 @@
+"""Stand-in GitHub and LLM backends for offline benchmarks."""
+
+import asyncio
+import json
+import re
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+ISSUES_PATH = re.compile(r"^/repos/[^/]+/[^/]+/issues$")
+
+BODY_TEMPLATE = (
+    "Steps to reproduce: call the endpoint with a large payload and observe the "
+    "response. Expected the request to succeed but it fails with a timeout after "
+    "retrying. Environment: Linux, Python 3.12, version {n}. "
+)
+
+# Label sets cycled through the generated issues; one in ten is a bug
+LABELS = [["bug"], ["enhancement"], ["documentation"], ["question"], [], ["enhancement", "help wanted"],
+          ["performance"], [], ["good first issue"], ["docs", "question"]]
+
+
+def make_issue_items(count: int, body_bytes: int = 800, pr_every: int = 10) -> List[dict]:
+    """
+    Build GitHub API issue payloads.
+    Every `pr_every`-th item is a pull request so PR filtering is exercised.
+    """
+    items = []
+    for n in range(count):
+        body = (BODY_TEMPLATE.format(n=n) * (body_bytes // len(BODY_TEMPLATE) + 1))[:body_bytes]
+        item = {
+            "id": 1_000_000 + n,
+            "number": n + 1,
+            "title": f"Issue {n}: request fails under load",
+            "body": body,
+            "html_url": f"https://github.com/bench/repo/issues/{n + 1}",
+            "created_at": f"2024-{n % 12 + 1:02d}-{n % 28 + 1:02d}T12:00:00Z",
+            "updated_at": f"2025-{n % 12 + 1:02d}-{n % 28 + 1:02d}T12:00:00Z",
+            "state": "open",
+            "labels": [{"name": name} for name in LABELS[n % len(LABELS)]],
+            "assignees": [{"login": f"dev{n % 7}"}] if n % 3 else [],
+            "milestone": {"title": f"v{n % 4 + 1}.0"} if n % 2 else None,
+            "comments": n % 20,
+            "reactions": {"total_count": n % 9},
+        }
+        if pr_every and n % pr_every == pr_every - 1:
+            item["pull_request"] = {"url": f"https://api.github.com/repos/bench/repo/pulls/{n + 1}"}
+        items.append(item)
+    return items
+
+
+class FakeGitHubTransport(httpx.MockTransport):
+    """
+    httpx transport that serves a paginated issues listing from memory.
+    Pages are rendered up front so serving cost does not skew client timings.
+    """
+    
+    def __init__(self, items: List[dict], latency: float = 0.0):
+        self.latency = latency
+        self.requests = 0
+        self._items = items
+        self._pages: Dict[tuple, bytes] = {}
+        super().__init__(self._handle)
+    
+    def _page(self, page: int, per_page: int) -> bytes:
+        key = (page, per_page)
+        if key not in self._pages:
+            start = (page - 1) * per_page
+            self._pages[key] = json.dumps(self._items[start:start + per_page]).encode()
+        return self._pages[key]
+    
+    def prerender(self, per_page: int = 100) -> None:
+        """Render every page for the given page size ahead of time."""
+        for page in range(1, len(self._items) // per_page + 2):
+            self._page(page, per_page)
+    
+    async def _handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if not ISSUES_PATH.match(request.url.path):
+            return httpx.Response(404, json={"message": "Not Found"})
+        page = int(request.url.params.get("page", "1"))
+        per_page = int(request.url.params.get("per_page", "30"))
+        return httpx.Response(
+            200,
+            content=self._page(page, per_page),
+            headers={"Content-Type": "application/json"},
+        )
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Chat model that answers instantly (plus a configurable latency) with a fixed reply.
+    Reports approximate token usage so usage-based code paths behave as with a real model.
+    """
+    
+    latency: float = 0.0
+    reply: str = "Summary: recurring timeouts under load; prioritize retry handling."
+    calls: int = 0
+    
+    @property
+    def _llm_type(self) -> str:
+        return "fake-latency-chat"
+    
+    def _result(self, messages: List[BaseMessage]) -> ChatResult:
+        self.calls += 1
+        input_tokens = sum(len(str(m.content)) for m in messages) // 4
+        output_tokens = len(self.reply) // 4
+        message = AIMessage(
+            content=self.reply,
+            usage_metadata={
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens,
+            },
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+    
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        if self.latency:
+            time.sleep(self.latency)
+        return self._result(messages)
+    
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._result(messages)
@@ -0,0 +1,346 @@
+"""
+Offline benchmark runner.
+
+Runs the scan, SQLite, snapshot and analyze hot paths against stand-in GitHub and LLM
+backends and writes machine-readable results that can be compared between runs.
+
+Usage:
+    python -m benchmarks.run
+    python -m benchmarks.run --sizes 10,1000 --llm-latency-ms 5
+    python -m benchmarks.run --only import
+    python -m benchmarks.run --save-baseline
+    python -m benchmarks.run --compare benchmarks/baselines/baseline.json
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from app.clients.github_client import GitHubClient, parse_issue
+from app.clients.llm_client import LLMClient
+from app.repositories.coordination_repository import CoordinationRepository
+from app.repositories.issue_filter import parse_filter
+from app.repositories.issue_repository import IssueRepository
+from app.services.analyze_service import AnalyzeService
+from app.services.scan_service import ScanService
+from app.services.snapshot_service import SnapshotService
+from benchmarks.fakes import FakeChatModel, FakeGitHubTransport, make_issue_items
+
+BENCH_DIR = Path(__file__).parent
+DEFAULT_SIZES = "10,100,1000,10000,50000"
+DEFAULT_OUTPUT = BENCH_DIR / "results" / "latest.json"
+DEFAULT_BASELINE = BENCH_DIR / "baselines" / "baseline.json"
+BENCH_REPO = "bench/repo"
+
+# Runs in a fresh interpreter: cold import time of the app and LangChain modules loaded
+IMPORT_PROBE = (
+    "import sys, time; start = time.perf_counter(); import app.main; "
+    "print(time.perf_counter() - start, sum(m.startswith('langchain') for m in sys.modules))"
+)
+
+
+def _median_time(fn: Callable[[], object], repeat: int) -> float:
+    """Run fn `repeat` times and return the median wall time in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def _cached_issues(size: int) -> List[dict]:
+    """Issues as the scan stores them (parsed API payloads without pull requests)."""
+    return [vars(parse_issue(item)) for item in make_issue_items(size, pr_every=0)]
+
+
+def _result(benchmark: str, size: int, metric: str, value: float, higher_is_better: bool) -> dict:
+    """Build one result record."""
+    return {
+        "benchmark": benchmark,
+        "issues": size,
+        "metric": metric,
+        "value": round(value, 4),
+        "higher_is_better": higher_is_better,
+    }
+
+
+def bench_scan(size: int, repeat: int, workdir: Path) -> List[dict]:
+    """Scan throughput through GitHubClient and ScanService against a mock GitHub."""
+    transport = FakeGitHubTransport(make_issue_items(size))
+    transport.prerender()
+    repository = IssueRepository(str(workdir / f"scan-{size}.db"))
+    repository.init_db()
+    coordination = CoordinationRepository(repository.db_path)
+    coordination.init_db()
+    service = ScanService(
+        github=GitHubClient(transport=transport), repository=repository, coordination=coordination
+    )
+    
+    scanned = {}
+    
+    def run():
+        scanned["result"] = asyncio.run(service.scan_repository(BENCH_REPO))
+    
+    elapsed = _median_time(run, repeat)
+    issues = scanned["result"].issues_fetched
+    return [
+        _result("scan", size, "issues_per_sec", issues / elapsed, True),
+        _result("scan", size, "seconds", elapsed, False),
+        _result("scan", size, "pages", transport.requests / repeat, False),
+    ]
+
+
+def bench_sqlite(size: int, repeat: int, workdir: Path) -> List[dict]:
+    """Write and read rates of IssueRepository."""
+    repository = IssueRepository(str(workdir / f"sqlite-{size}.db"))
+    repository.init_db()
+    issues = _cached_issues(size)
+    
+    write_elapsed = _median_time(lambda: repository.save_issues(BENCH_REPO, issues), repeat)
+    read_elapsed = _median_time(lambda: repository.get_issues_by_repo(BENCH_REPO), repeat)
+    return [
+        _result("sqlite_write", size, "rows_per_sec", size / write_elapsed, True),
+        _result("sqlite_read", size, "rows_per_sec", size / read_elapsed, True),
+        _result("sqlite", size, "db_bytes", Path(repository.db_path).stat().st_size, False),
+    ]
+
+
+def bench_snapshot(size: int, repeat: int, workdir: Path) -> List[dict]:
+    """Gzip NDJSON export and bulk import rates of SnapshotService."""
+    repository = IssueRepository(str(workdir / f"snapshot-{size}.db"))
+    repository.init_db()
+    repository.save_issues(BENCH_REPO, _cached_issues(size))
+    coordination = CoordinationRepository(repository.db_path)
+    coordination.init_db()
+    service = SnapshotService(repository=repository, coordination=coordination)
+    
+    exported = {}
+    
+    def export():
+        exported["data"] = b"".join(service.export_ndjson(gzip=True))
+    
+    async def chunks():
+        data = exported["data"]
+        for i in range(0, len(data), 64 * 1024):
+            yield data[i:i + 64 * 1024]
+    
+    def load():
+        asyncio.run(service.import_ndjson(chunks()))
+    
+    export_elapsed = _median_time(export, repeat)
+    import_elapsed = _median_time(load, repeat)
+    return [
+        _result("snapshot_export", size, "rows_per_sec", size / export_elapsed, True),
+        _result("snapshot_import", size, "rows_per_sec", size / import_elapsed, True),
+        _result("snapshot", size, "gzip_bytes", len(exported["data"]), False),
+    ]
+
+
+def bench_analyze(size: int, repeat: int, workdir: Path, llm_latency: float) -> List[dict]:
+    """End-to-end AnalyzeService latency (default mode) with a fake chat model."""
+    repository = IssueRepository(str(workdir / f"analyze-{size}.db"))
+    repository.init_db()
+    repository.save_issues(BENCH_REPO, _cached_issues(size))
+    coordination = CoordinationRepository(repository.db_path)
+    coordination.init_db()
+    model = FakeChatModel(latency=llm_latency)
+    service = AnalyzeService(llm=LLMClient(llm=model), repository=repository, coordination=coordination)
+    
+    def run():
+        # Invalidate the shared result so every repetition pays for a full analysis
+        coordination.invalidate_repo(BENCH_REPO)
+        asyncio.run(service.analyze_issues(BENCH_REPO, "Find recurring themes", mode="default"))
+    
+    elapsed = _median_time(run, repeat)
+    return [
+        _result("analyze", size, "seconds", elapsed, False),
+        _result("analyze", size, "llm_calls", model.calls / repeat, False),
+    ]
+
+
+def bench_analyze_filtered(size: int, repeat: int, workdir: Path, llm_latency: float) -> List[dict]:
+    """
+    AnalyzeService latency and LLM calls (default mode) for a filter selecting a tenth of the issues.
+    The repo is cached through ScanService, so the metadata the filter needs must survive a scan.
+    """
+    repository = IssueRepository(str(workdir / f"filtered-{size}.db"))
+    repository.init_db()
+    coordination = CoordinationRepository(repository.db_path)
+    coordination.init_db()
+    scanner = ScanService(
+        github=GitHubClient(transport=FakeGitHubTransport(make_issue_items(size, pr_every=0))),
+        repository=repository,
+        coordination=coordination
+    )
+    asyncio.run(scanner.scan_repository(BENCH_REPO))
+    matched = repository.get_issue_count(BENCH_REPO, parse_filter("label:bug"))
+    model = FakeChatModel(latency=llm_latency)
+    service = AnalyzeService(llm=LLMClient(llm=model), repository=repository, coordination=coordination)
+    
+    def run():
+        coordination.invalidate_repo(BENCH_REPO)
+        asyncio.run(service.analyze_issues(BENCH_REPO, "Find recurring themes", mode="default", filter_expression="label:bug"))
+    
+    elapsed = _median_time(run, repeat)
+    return [
+        _result("analyze_filtered", size, "seconds", elapsed, False),
+        _result("analyze_filtered", size, "llm_calls", model.calls / repeat, False),
+        _result("analyze_filtered", size, "issues_matched", matched, False),
+    ]
+
+
+def bench_analyze_batch(size: int, repeat: int, workdir: Path, llm_latency: float, prompts: int = 10) -> List[dict]:
+    """AnalyzeService batch latency and LLM calls for several prompts sharing one map pass."""
+    repository = IssueRepository(str(workdir / f"batch-{size}.db"))
+    repository.init_db()
+    repository.save_issues(BENCH_REPO, _cached_issues(size))
+    coordination = CoordinationRepository(repository.db_path)
+    coordination.init_db()
+    model = FakeChatModel(latency=llm_latency)
+    service = AnalyzeService(llm=LLMClient(llm=model), repository=repository, coordination=coordination)
+    batch = [f"Report {i}: find recurring themes" for i in range(prompts)]
+    
+    def run():
+        coordination.invalidate_repo(BENCH_REPO)
+        asyncio.run(service.analyze_batch(BENCH_REPO, batch, mode="default"))
+    
+    elapsed = _median_time(run, repeat)
+    return [
+        _result("analyze_batch", size, "seconds", elapsed, False),
+        _result("analyze_batch", size, "llm_calls", model.calls / repeat, False),
+    ]
+
+
+def bench_import(repeat: int) -> List[dict]:
+    """Cold-start import time of app.main; health and scan traffic must not load LangChain."""
+    timings = []
+    langchain_modules = 0
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", IMPORT_PROBE],
+            cwd=BENCH_DIR.parent, capture_output=True, text=True, check=True
+        ).stdout.split()
+        timings.append(float(output[0]))
+        langchain_modules = max(langchain_modules, int(output[1]))
+    return [
+        _result("import", 0, "seconds", statistics.median(timings), False),
+        _result("import", 0, "langchain_modules", langchain_modules, False),
+    ]
+
+
+def run_benchmarks(sizes: List[int], repeat: int, llm_latency: float, only: List[str]) -> dict:
+    """Run the selected benchmarks for every size and return the results document."""
+    results = []
+    if "import" in only:
+        results.extend(bench_import(repeat))
+    with tempfile.TemporaryDirectory(prefix="issue-analyzer-bench-") as tmp:
+        workdir = Path(tmp)
+        for size in sizes:
+            if "scan" in only:
+                results.extend(bench_scan(size, repeat, workdir))
+            if "sqlite" in only:
+                results.extend(bench_sqlite(size, repeat, workdir))
+            if "snapshot" in only:
+                results.extend(bench_snapshot(size, repeat, workdir))
+            if "analyze" in only:
+                results.extend(bench_analyze(size, repeat, workdir, llm_latency))
+                results.extend(bench_analyze_filtered(size, repeat, workdir, llm_latency))
+                results.extend(bench_analyze_batch(size, repeat, workdir, llm_latency))
+            print(f"  finished size={size}", file=sys.stderr)
+    
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "repeat": repeat,
+            "llm_latency_ms": llm_latency * 1000,
+        },
+        "results": results,
+    }
+
+
+def _key(record: dict) -> tuple:
+    return record["benchmark"], record["issues"], record["metric"]
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> List[str]:
+    """
+    Compare results against a baseline.
+    Returns a description of every metric that regressed by more than `tolerance`.
+    """
+    previous: Dict[tuple, dict] = {_key(r): r for r in baseline["results"]}
+    regressions = []
+    for record in current["results"]:
+        old = previous.get(_key(record))
+        if not old or not old["value"]:
+            continue
+        change = (record["value"] - old["value"]) / old["value"]
+        worse = -change if record["higher_is_better"] else change
+        if worse > tolerance:
+            regressions.append(
+                f"{record['benchmark']}[{record['issues']}] {record['metric']}: "
+                f"{old['value']} -> {record['value']} ({change:+.1%})"
+            )
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Run offline performance benchmarks.")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Comma-separated issue counts")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement (median is kept)")
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="Simulated latency per LLM call")
+    parser.add_argument("--only", default="import,scan,sqlite,snapshot,analyze", help="Comma-separated benchmarks to run")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT, help="Where to write results")
+    parser.add_argument("--compare", type=Path, nargs="?", const=DEFAULT_BASELINE, help="Baseline to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed regression ratio before failing")
+    parser.add_argument("--save-baseline", action="store_true", help="Also store the results as the baseline")
+    args = parser.parse_args()
+    
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    only = [b.strip() for b in args.only.split(",") if b.strip()]
+    current = run_benchmarks(sizes, args.repeat, args.llm_latency_ms / 1000, only)
+    
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(current, indent=2))
+    print(f"Results written to {args.output}", file=sys.stderr)
+    
+    if args.save_baseline:
+        DEFAULT_BASELINE.parent.mkdir(parents=True, exist_ok=True)
+        DEFAULT_BASELINE.write_text(json.dumps(current, indent=2))
+        print(f"Baseline saved to {DEFAULT_BASELINE}", file=sys.stderr)
+    
+    for record in current["results"]:
+        print(f"{record['benchmark']:>15} {record['issues']:>6} {record['metric']:>15} {record['value']}")
+    
+    status = 0
+    if any(r["metric"] == "langchain_modules" and r["value"] for r in current["results"]):
+        print("Importing app.main loaded LangChain; it must only load on the first /analyze", file=sys.stderr)
+        status = 1
+    
+    if args.compare:
+        regressions = compare(current, json.loads(args.compare.read_text()), args.tolerance)
+        if regressions:
+            print("Regressions detected:", file=sys.stderr)
+            for line in regressions:
+                print(f"  {line}", file=sys.stderr)
+            return 1
+        print("No regressions against baseline", file=sys.stderr)
+    
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())